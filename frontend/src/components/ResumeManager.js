@@ -11,6 +11,7 @@ const ResumeManager = () => {
     const [itemsPerPage] = useState(10);
     const [editingCandidate, setEditingCandidate] = useState(null);
     const [showRawText, setShowRawText] = useState({});
+    const [rawTexts, setRawTexts] = useState({});
 
     const handleFileChange = (e) => {
         const selectedFiles = Array.from(e.target.files);
@@ -81,8 +82,9 @@ const ResumeManager = () => {
 
     const handleExportCSV = async () => {
         try {
+            // Candidates are stored server-side, so only their ids are sent back
             const response = await axios.post('http://localhost:5001/export-csv', 
-                { candidates }, 
+                { ids: candidates.map(c => c.id) }, 
                 { responseType: 'blob' }
             );
 
@@ -99,7 +101,19 @@ const ResumeManager = () => {
         }
     };
 
-    const toggleRawText = (candidateId) => {
+    const toggleRawText = async (candidateId) => {
+        // Upload responses leave rawText out, so it is fetched the first time it is shown
+        if (!showRawText[candidateId] && rawTexts[candidateId] === undefined) {
+            try {
+                const response = await axios.get(`http://localhost:5001/candidates/${candidateId}/text`);
+                setRawTexts(prev => ({ ...prev, [candidateId]: response.data.rawText }));
+            } catch (error) {
+                console.error('Error loading raw text:', error);
+                alert('Failed to load raw text');
+                return;
+            }
+        }
+
         setShowRawText(prev => ({
             ...prev,
             [candidateId]: !prev[candidateId]
@@ -274,12 +288,12 @@ const ResumeManager = () => {
                                                 )}
                                             </td>
                                         </tr>
-                                        {showRawText[candidate.id] && candidate.rawText && (
+                                        {showRawText[candidate.id] && rawTexts[candidate.id] && (
                                             <tr>
                                                 <td colSpan="6">
                                                     <div className="raw-text-container">
                                                         <strong>Raw Extracted Text:</strong>
-                                                        <pre className="raw-text">{candidate.rawText}</pre>
+                                                        <pre className="raw-text">{rawTexts[candidate.id]}</pre>
                                                     </div>
                                                 </td>
                                             </tr>
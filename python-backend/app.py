@@ -1,49 +1,45 @@
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, request, jsonify, Response, stream_with_context
 from flask_cors import CORS
 import os
-import tempfile
 import shutil
-import zipfile
 from pathlib import Path
 import uuid
 from datetime import datetime
 import csv
+import gzip
 import io
 import re
-import nltk
 import time
-from nltk.corpus import stopwords
-from docling.document_converter import DocumentConverter
+import zlib
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+import threading
+from collections import Counter
 import json
-
-# Download required NLTK data
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt')
-
-try:
-    nltk.data.find('corpora/stopwords')
-except LookupError:
-    nltk.download('stopwords')
-
-try:
-    nltk.data.find('taggers/averaged_perceptron_tagger')
-except LookupError:
-    nltk.download('averaged_perceptron_tagger')
-
-try:
-    nltk.data.find('chunkers/maxent_ne_chunker')
-except LookupError:
-    nltk.download('maxent_ne_chunker')
-
-try:
-    nltk.data.find('corpora/words')
-except LookupError:
-    nltk.download('words')
+from functools import cached_property
+from candidate_store import CandidateStore
+from conversion_cache import ConversionCache
+from conversion_sandbox import ConversionCancelled, SandboxPool
+from identity_index import IdentityIndex
+from job_store import JobStore
+from lexicon import get_lexicon
+from contact_scanner import scan_contacts, digits_only
+from near_duplicates import NearDuplicateIndex, duplicate_clusters
+from nlp_engine import NlpEngine
+from layout_index import LayoutIndex
+from document_source import DocumentSource, as_document_source
+from zip_ingest import iter_zip_documents, ZipLimitExceeded
+from docx_text import extract_docx_text, is_docx
+from pdf_text import TextLayerQuality, TextLayerRejected, extract_pdf_text, is_pdf
+from search_index import SearchIndex
+from scheduler import FAST_LANE, HEAVY_LANE, estimate_cost, run_lanes
+from triage import triage_document, REJECT as TRIAGE_REJECT, DEPRIORITIZE as TRIAGE_DEPRIORITIZE
 
 app = Flask(__name__)
 CORS(app)
+# Keys keep the order records are built in; sorting every key of large batches only costs time
+app.json.sort_keys = False
 
 # Configure upload settings
 UPLOAD_FOLDER = 'temp_uploads'
@@ -52,43 +48,215 @@ if not os.path.exists(UPLOAD_FOLDER):
 
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = 50 * 1024 * 1024  # 50MB max file size
+# Number of parser processes for batch uploads (1 parses in-process, sequentially)
+app.config['PARSER_WORKERS'] = int(os.environ.get('PARSER_WORKERS', '1'))
+
+# Conversion cache: in-memory LRU tier plus a size-bounded disk tier shared by all workers
+app.config['CONVERSION_CACHE_DIR'] = os.environ.get('CONVERSION_CACHE_DIR', 'conversion_cache')
+app.config['CONVERSION_CACHE_MEMORY_ENTRIES'] = int(os.environ.get('CONVERSION_CACHE_MEMORY_ENTRIES', '256'))
+app.config['CONVERSION_CACHE_DISK_BYTES'] = int(os.environ.get('CONVERSION_CACHE_DISK_MB', '512')) * 1024 * 1024
+
+# ZIP uploads are read member by member; these limits stop a single archive exhausting disk or RAM
+app.config['ZIP_MAX_MEMBERS'] = int(os.environ.get('ZIP_MAX_MEMBERS', '100'))
+app.config['ZIP_MAX_TOTAL_BYTES'] = int(os.environ.get('ZIP_MAX_TOTAL_MB', '200')) * 1024 * 1024
+# Documents up to this size stay in memory; larger ones are spilled to a temporary file
+app.config['DOCUMENT_SPILL_THRESHOLD'] = int(os.environ.get('DOCUMENT_SPILL_THRESHOLD_MB', '8')) * 1024 * 1024
+# Triage: documents longer than the hard limit are rejected before conversion, past the soft limit deprioritized
+app.config['TRIAGE_MAX_PAGES'] = int(os.environ.get('TRIAGE_MAX_PAGES', '30'))
+app.config['TRIAGE_SOFT_MAX_PAGES'] = int(os.environ.get('TRIAGE_SOFT_MAX_PAGES', '6'))
+
+# PDF conversion engine: 'text' reads text layers directly and falls back to docling, 'docling' always uses docling
+app.config['PDF_ENGINE'] = os.environ.get('PDF_ENGINE', 'text')
+# Text layer quality checks; a PDF failing any of them is converted by docling
+app.config['PDF_TEXT_MIN_CHARS_PER_PAGE'] = int(os.environ.get('PDF_TEXT_MIN_CHARS_PER_PAGE', '100'))
+app.config['PDF_TEXT_MAX_BAD_CHAR_RATIO'] = float(os.environ.get('PDF_TEXT_MAX_BAD_CHAR_RATIO', '0.05'))
+app.config['PDF_TEXT_MIN_WORD_RATIO'] = float(os.environ.get('PDF_TEXT_MIN_WORD_RATIO', '0.6'))
+app.config['PDF_TEXT_MAX_AVG_WORD_LENGTH'] = float(os.environ.get('PDF_TEXT_MAX_AVG_WORD_LENGTH', '20'))
+
+# DOCX conversion engine: 'ooxml' reads word/document.xml directly and falls back to docling, 'docling' always uses docling
+app.config['DOCX_ENGINE'] = os.environ.get('DOCX_ENGINE', 'ooxml')
+
+# Progressive conversion: convert this many leading PDF pages first and the rest only when a field is missing (0 converts everything)
+app.config['PROGRESSIVE_PAGES'] = int(os.environ.get('PROGRESSIVE_PAGES', '1'))
+
+# Scheduler lanes: cheap documents run on the fast lane, docling/OCR documents on a heavy lane of at most this many at once
+app.config['FAST_LANE_WORKERS'] = int(os.environ.get('FAST_LANE_WORKERS', '1'))
+app.config['HEAVY_LANE_WORKERS'] = int(os.environ.get('HEAVY_LANE_WORKERS', '1'))
+
+# Conversions run in killable sandbox processes with a deadline and a resident memory ceiling per document
+app.config['CONVERSION_SANDBOX'] = os.environ.get('CONVERSION_SANDBOX', 'true').lower() in ('1', 'true', 'yes')
+# By default one sandbox per lane worker, so the heavy lane never holds up a fast conversion;
+# parser pool workers handle one file at a time and need only one each
+app.config['CONVERSION_SANDBOXES'] = int(os.environ.get(
+    'CONVERSION_SANDBOXES',
+    1 if app.config['PARSER_WORKERS'] > 1 else app.config['FAST_LANE_WORKERS'] + app.config['HEAVY_LANE_WORKERS']
+))
+app.config['CONVERSION_TIMEOUT_SECONDS'] = float(os.environ.get('CONVERSION_TIMEOUT_SECONDS', '120'))
+app.config['CONVERSION_MEMORY_LIMIT_BYTES'] = int(os.environ.get('CONVERSION_MEMORY_LIMIT_MB', '4096')) * 1024 * 1024
+# Sandbox processes are replaced after this many documents to contain leaks
+app.config['CONVERSION_MAX_DOCUMENTS'] = int(os.environ.get('CONVERSION_MAX_DOCUMENTS', '200'))
+
+# JSON responses at least this large are gzip-compressed for clients that accept it
+app.config['GZIP_MIN_BYTES'] = int(os.environ.get('GZIP_MIN_BYTES', '1024'))
+app.config['GZIP_LEVEL'] = int(os.environ.get('GZIP_LEVEL', '5'))
 
-# Initialize stopwords
-stop = stopwords.words('english')
+# Batch jobs: persistent state lives in a local SQLite database
+app.config['DATA_FOLDER'] = os.environ.get('DATA_FOLDER', 'data')
+# Full-text search index over candidate texts; segments are merged this many at a time
+app.config['SEARCH_INDEX_DIR'] = os.environ.get('SEARCH_INDEX_DIR', os.path.join(app.config['DATA_FOLDER'], 'search_index'))
+app.config['SEARCH_MERGE_FACTOR'] = int(os.environ.get('SEARCH_MERGE_FACTOR', '10'))
+# Near-duplicate detection: estimated Jaccard similarity of word shingles at which two resumes count as duplicates
+app.config['NEAR_DUPLICATE_THRESHOLD'] = float(os.environ.get('NEAR_DUPLICATE_THRESHOLD', '0.7'))
+# Country code assumed for phone numbers written without one when resolving identities
+app.config['DEFAULT_PHONE_COUNTRY_CODE'] = os.environ.get('DEFAULT_PHONE_COUNTRY_CODE', '91')
+# Name extraction runs NER on this many leading lines before falling back to the whole document
+app.config['NAME_HEADER_LINES'] = int(os.environ.get('NAME_HEADER_LINES', '15'))
+# Documents whose NER tagging/chunking is batched together when parsing in-process
+app.config['NLP_BATCH_SIZE'] = int(os.environ.get('NLP_BATCH_SIZE', '8'))
+# Load models in the background at server start so /ready turns green without waiting for traffic
+app.config['WARM_UP_ON_START'] = os.environ.get('WARM_UP_ON_START', 'true').lower() in ('1', 'true', 'yes')
+app.config['JOB_WORKERS'] = int(os.environ.get('JOB_WORKERS', max(app.config['PARSER_WORKERS'], 1)))
+# A process claims each job file for this long; a file still running after that is taken over by another process
+app.config['JOB_LEASE_SECONDS'] = float(os.environ.get('JOB_LEASE_SECONDS', '900'))
+
+class ConvertedDocument:
+    """A single docling conversion result with lazily computed exports.
+    
+    Text export, markdown export and formatting extraction each fail independently,
+    so a failure in one step never causes the document to be converted again.
+    """
+    
+    def __init__(self, result, parser):
+        self.result = result
+        self.parser = parser
+        self.errors = []
+    
+    @property
+    def document(self):
+        return getattr(self.result, 'document', None)
+    
+    @property
+    def total_pages(self):
+        """Page count of the whole input document, even when only a page range was converted"""
+        return getattr(getattr(self.result, 'input', None), 'page_count', None)
+    
+    @cached_property
+    def text(self):
+        """Plain text of the document"""
+        try:
+            if hasattr(self.result, 'text'):
+                return self.result.text
+            elif hasattr(self.result, 'content'):
+                return self.result.content
+            elif hasattr(self.result, 'document'):
+                return str(self.result.document)
+            return str(self.result)
+        except Exception as e:
+            self.errors.append(f'text export: {e}')
+            return ""
+    
+    @cached_property
+    def markdown(self):
+        """Markdown export of the document, falling back to plain text"""
+        if self.document is not None:
+            try:
+                return self.document.export_to_markdown()
+            except Exception as e:
+                print(f"Markdown export failed, using plain text: {e}")
+                self.errors.append(f'markdown export: {e}')
+        return self.text
+    
+    @cached_property
+    def formatting(self):
+        """Formatting information (font size, line position) as a LayoutIndex"""
+        try:
+            document = self.document
+            if document and hasattr(document, 'body') and document.body:
+                return self.parser._extract_formatting_from_docling_body(document.body.children, self.markdown, document)
+        except Exception as e:
+            print(f"Formatting extraction failed: {e}")
+            self.errors.append(f'formatting: {e}')
+        return LayoutIndex()
 
 class ResumeParser:
-    def __init__(self):
-        self.converter = DocumentConverter()
+    def __init__(self, cache=None, lexicon=None, name_header_lines=15, nlp=None, pdf_engine='text',
+                 pdf_text_quality=None, docx_engine='ooxml', progressive_pages=0, sandbox=None):
+        # The docling converter is built on first use so importing this module stays fast
+        self._converter = None
+        self._converter_lock = threading.Lock()
+        # Scheduler lanes share the parser; in-process docling conversions still run one at a time
+        self._conversion_lock = threading.Lock()
+        self.cache = cache
+        # 'text' reads PDF text layers directly and only sends failing ones to docling; 'docling' always uses docling
+        self.pdf_engine = pdf_engine
+        self.pdf_text_quality = pdf_text_quality or TextLayerQuality()
+        # 'ooxml' reads DOCX XML directly and falls back to docling if that fails; 'docling' always uses docling
+        self.docx_engine = docx_engine
+        # When set, PDFs are converted this many pages at first and only in full if a field is missing
+        self.progressive_pages = progressive_pages
+        # Optional SandboxPool: conversions then run in killable processes with time and memory limits
+        self.sandbox = sandbox
+        self.lexicon = lexicon or get_lexicon()
+        self.name_header_lines = name_header_lines
+        self.nlp = nlp or NlpEngine()
+    
+    @property
+    def converter(self):
+        """Docling document converter, imported and constructed on first use"""
+        if self._converter is None:
+            with self._converter_lock:
+                if self._converter is None:
+                    from docling.document_converter import DocumentConverter
+                    self._converter = DocumentConverter()
+        return self._converter
+    
+    @property
+    def converter_loaded(self):
+        """Whether the document converter (in this process or in the sandboxes) has been loaded"""
+        if self.sandbox is not None:
+            return self.sandbox.is_warm
+        return self._converter is not None
+    
+    @property
+    def is_warm(self):
+        """Whether the converter and NLP models have been loaded"""
+        return self.converter_loaded and self.nlp.loaded
+    
+    def warm_up(self):
+        """Load the converter pipelines and NLP models up front instead of on the first document"""
+        if self.sandbox is not None:
+            self.sandbox.warm_up()
+        else:
+            self.warm_up_converter()
+        self.nlp.load()
+    
+    def warm_up_converter(self):
+        """Load the docling converter and its PDF and DOCX pipelines"""
+        converter = self.converter
+        try:
+            from docling.datamodel.base_models import InputFormat
+            for input_format in (InputFormat.PDF, InputFormat.DOCX):
+                converter.initialize_pipeline(input_format)
+        except Exception as e:
+            print(f"Failed to warm up document converter pipelines: {e}")
     
     def extract_phone_numbers(self, text):
         """Extract phone numbers including international formats"""
-        # More precise regex patterns for phone numbers
-        patterns = [
-            r'(\+91[-.\s]?\d{10})',  # Indian format +91 followed by 10 digits
-            r'(\+\d{1,3}[-.\s]?\d{10})',  # Other international formats
-            r'(\+\d{1,3}[-.\s]?\d{3}[-.\s]?\d{3}[-.\s]?\d{4})',  # International with separators
-            r'(\d{10})',  # Exactly 10 digits
-            r'(\(\d{3}\)\s*\d{3}[-.\s]?\d{4})',    # (xxx) xxx-xxxx
-            r'(\d{3}[-.\s]\d{3}[-.\s]\d{4})',  # xxx-xxx-xxxx or xxx.xxx.xxxx
-        ]
+        # Well-formed layouts found by the single-pass contact scanner
+        phone_numbers = [token for token in scan_contacts(text) if token.kind == 'phone' and token.strict]
         
-        phone_numbers = []
-        for pattern in patterns:
-            matches = re.findall(pattern, text)
-            phone_numbers.extend(matches)
-        
-        # Clean and validate phone numbers
+        # Validate phone numbers
         valid_numbers = []
-        for number in phone_numbers:
-            # Clean the number
-            cleaned = re.sub(r'[^\d+]', '', number)
+        for token in phone_numbers:
+            number = token.value
             
             # Skip if it's just numbers that look like decimals or coordinates
             if '.' in number and len(number.split('.')) == 2:
                 continue
                 
             # Check for valid phone number patterns
-            digit_count = len(re.sub(r'[^\d]', '', cleaned))
+            digits = token.normalized.lstrip('+')
+            digit_count = len(digits)
             
             # Valid phone number criteria:
             # - 10 digits (Indian mobile)
@@ -96,16 +264,13 @@ class ResumeParser:
             # - Not starting with 0 (unless it's a country code)
             # - Not containing repeated patterns that look like decimals
             if digit_count >= 10 and digit_count <= 15:
-                # Additional validation to avoid false positives
-                digits_only = re.sub(r'[^\d]', '', number)
-                
                 # Skip numbers that are clearly not phone numbers
                 if (
-                    len(set(digits_only[-4:])) > 1 and  # Last 4 digits should have some variation
-                    not re.match(r'^0+', digits_only) and  # Don't start with all zeros
+                    len(set(digits[-4:])) > 1 and  # Last 4 digits should have some variation
+                    not digits.startswith('0') and  # Don't start with all zeros
                     '.' not in number.replace('+', '')  # Avoid decimal numbers
                 ):
-                    valid_numbers.append(number.strip())
+                    valid_numbers.append(number)
         
         # Sort by length (longer numbers with country codes first) and remove duplicates
         valid_numbers = list(set(valid_numbers))
@@ -115,8 +280,7 @@ class ResumeParser:
     
     def extract_email_addresses(self, text):
         """Extract email addresses"""
-        pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        emails = re.findall(pattern, text)
+        emails = [token.value for token in scan_contacts(text) if token.kind == 'email']
         
         # Filter out invalid emails
         valid_emails = []
@@ -134,15 +298,8 @@ class ResumeParser:
         email_lower = email.lower()
         
         # Exclude system/technical emails
-        invalid_patterns = [
-            'mongodb.net', 'localhost', '127.0.0.1', 'test.com', 'example.com',
-            'noreply', 'no-reply', 'admin@', 'system@', 'root@', 'info@',
-            'support@', 'help@', 'contact@', 'sales@', 'marketing@'
-        ]
-        
-        for pattern in invalid_patterns:
-            if pattern in email_lower:
-                return False
+        if self.lexicon.invalid_email_patterns.search(email_lower):
+            return False
         
         # Check for random/generated email patterns
         local_part = email.split('@')[0]
@@ -159,40 +316,96 @@ class ResumeParser:
     
     def ie_preprocess(self, document):
         """Preprocess document for information extraction"""
-        # Remove stopwords and tokenize
-        document = ' '.join([i for i in document.split() if i.lower() not in stop])
-        sentences = nltk.sent_tokenize(document)
-        sentences = [nltk.word_tokenize(sent) for sent in sentences]
-        sentences = [nltk.pos_tag(sent) for sent in sentences]
-        return sentences
+        # Remove stopwords, tokenize and POS-tag with the preloaded models
+        return self.nlp.tag_documents([document])[0]
     
     def extract_names(self, document):
         """Extract person names using Named Entity Recognition"""
+        names, _tier = self.extract_names_cascade(document)
+        return names
+    
+    def extract_names_cascade(self, document):
+        """Extract person names with the cheapest tier that yields a confident candidate.
+        
+        Tiers run in order and stop at the first confident result:
+        'header'      - standalone capitalized lines at the top of the document
+        'header_ner'  - NER over the first NAME_HEADER_LINES lines
+        'full_ner'    - NER over the whole document plus the fallback heuristics
+        Returns (names, tier); tier is None when no tier found a name.
+        """
+        return self.extract_names_cascade_batch([document])[0]
+    
+    def extract_names_cascade_batch(self, documents):
+        """Run the name cascade over several documents, batching each NER tier across them"""
+        results = [None] * len(documents)
+        lines_per_document = [document.split('\n') for document in documents]
+        
+        # Tier 1: cheap position heuristics on the document header
+        header_names = [self.extract_header_names(lines) for lines in lines_per_document]
+        for i, names in enumerate(header_names):
+            if names and self.validate_extracted_name(names[0]):
+                results[i] = (names[:5], 'header')
+        
+        # Tier 2: NER restricted to a bounded header window
+        pending = [i for i, result in enumerate(results) if result is None]
+        header_windows = ['\n'.join(lines_per_document[i][:self.name_header_lines]) for i in pending]
+        for i, ner_names in zip(pending, self._extract_ner_names_batch(header_windows)):
+            if ner_names:
+                results[i] = (self._unique_person_names(ner_names + header_names[i])[:5], 'header_ner')
+        
+        # Tier 3: full-document NER plus the fallback heuristics (last resort)
+        pending = [i for i, result in enumerate(results) if result is None]
+        full_documents = [documents[i] for i in pending]
+        for i, ner_names in zip(pending, self._extract_ner_names_batch(full_documents)):
+            names = ner_names + self.extract_names_fallback(documents[i])
+            unique_names = self._unique_person_names(header_names[i] + names)
+            results[i] = (unique_names[:5], ('full_ner' if unique_names else None))  # Top 5 most likely names
+        
+        return results
+    
+    def extract_header_names(self, lines, max_lines=5):
+        """Find standalone 2-4 word capitalized names in the first few non-empty lines"""
         names = []
+        checked = 0
+        for line in lines:
+            # Strip markdown heading/emphasis markers added by the converter
+            line = line.strip().strip('#*_ ').strip()
+            if not line:
+                continue
+            checked += 1
+            if checked > max_lines:
+                break
+            
+            # Skip lines that are clearly headers or metadata
+            if any(keyword in line.lower() for keyword in ['resume', 'cv', 'curriculum']):
+                continue
+            
+            words = line.split()
+            if 2 <= len(words) <= 4 and self.is_likely_person_name(line):
+                names.append(' '.join(words))
+        
+        return names
+    
+    def _extract_ner_names_batch(self, documents):
+        """Run NER over several texts at once and return likely person names for each"""
+        if not documents:
+            return []
         try:
-            sentences = self.ie_preprocess(document)
-            for tagged_sentence in sentences:
-                chunks = nltk.ne_chunk(tagged_sentence)
-                for chunk in chunks:
-                    if hasattr(chunk, 'label') and chunk.label() == 'PERSON':
-                        name = ' '.join([c[0] for c in chunk])
-                        # Filter out obvious non-names
-                        if self.is_likely_person_name(name):
-                            names.append(name)
+            entities = self.nlp.person_names(documents)
         except Exception as e:
             print(f"Error in name extraction: {e}")
+            return [[] for _ in documents]
         
-        # Always try fallback method as well
-        fallback_names = self.extract_names_fallback(document)
-        names.extend(fallback_names)
-        
-        # Remove duplicates and filter
+        # Filter out obvious non-names
+        return [[name for name in names if self.is_likely_person_name(name)] for names in entities]
+    
+    def _unique_person_names(self, names):
+        """Remove duplicates and non-names, keeping the first occurrence order"""
         unique_names = []
         for name in names:
             if name not in unique_names and self.is_likely_person_name(name):
                 unique_names.append(name)
-        
-        return unique_names[:5]  # Return top 5 most likely names
+        return unique_names
     
     def is_likely_person_name(self, name):
         """Check if a string is likely to be a person's name"""
@@ -202,85 +415,14 @@ class ResumeParser:
         name = name.strip()
         words = name.split()
         
-        # Common job titles and technical terms to exclude
-        job_titles = {
-            'intern', 'developer', 'engineer', 'manager', 'analyst', 'designer',
-            'specialist', 'coordinator', 'assistant', 'associate', 'consultant',
-            'director', 'supervisor', 'lead', 'senior', 'junior', 'student',
-            'trainee', 'graduate', 'fresher', 'experienced', 'science', 'technology',
-            'data', 'software', 'web', 'full', 'stack', 'backend', 'frontend',
-            'mobile', 'ios', 'android', 'devops', 'cloud', 'machine', 'learning',
-            'artificial', 'intelligence', 'business', 'product', 'project',
-            'warehouse', 'picker', 'cashier', 'customer', 'service', 'representative',
-            'sales', 'increasing', 'qualified', 'global', 'markets', 'foodspotting',
-            'call', 'logging', 'implementation', 'documentation', 'request',
-            'metadata', 'context', 'information', 'details', 'current', 'prompt',
-            'flow', 'visual', 'studio', 'code', 'module', 'globally', 'system',
-            'command', 'line', 'args'
-        }
-        
-        # Technical terms to exclude
-        tech_terms = {
-            'matplotlib', 'python', 'java', 'javascript', 'react', 'node', 'express',
-            'html', 'css', 'sql', 'mongodb', 'mysql', 'postgresql', 'git', 'github',
-            'aws', 'azure', 'docker', 'kubernetes', 'linux', 'windows', 'macos',
-            'bootstrap', 'jquery', 'angular', 'vue', 'django', 'flask', 'redux',
-            'typescript', 'php', 'ruby', 'golang', 'swift', 'kotlin', 'scala',
-            'pandas', 'numpy', 'tensorflow', 'pytorch', 'opencv', 'sklearn',
-            'toolkit', 'airflow', 'apache', 'prism', 'recruit', 'electronics'
-        }
-        
-        # Location names to exclude (Indian states, cities, countries)
-        locations = {
-            'west', 'bengal', 'delhi', 'mumbai', 'bangalore', 'chennai', 'hyderabad',
-            'pune', 'kolkata', 'ahmedabad', 'jaipur', 'surat', 'lucknow', 'kanpur',
-            'nagpur', 'patna', 'indore', 'thane', 'bhopal', 'visakhapatnam',
-            'kerala', 'tamil', 'nadu', 'karnataka', 'maharashtra', 'gujarat',
-            'rajasthan', 'punjab', 'haryana', 'bihar', 'odisha', 'assam',
-            'uttarakhand', 'himachal', 'pradesh', 'madhya', 'pradesh', 'goa',
-            'tripura', 'manipur', 'meghalaya', 'mizoram', 'nagaland', 'sikkim',
-            'andhra', 'telangana', 'jharkhand', 'chhattisgarh', 'jammu', 'kashmir',
-            'india', 'indian', 'university', 'college', 'institute', 'school',
-            'government', 'engineering', 'technology', 'management', 'medical',
-            'jalpaiguri', 'darjeeling', 'siliguri', 'durgapur', 'asansol',
-            'quest', 'quine', 'communication'
-        }
-        
-        # Company/Organization names to exclude
-        companies = {
-            'google', 'microsoft', 'amazon', 'facebook', 'apple', 'netflix',
-            'uber', 'airbnb', 'tesla', 'spacex', 'ibm', 'oracle', 'salesforce',
-            'adobe', 'intel', 'nvidia', 'qualcomm', 'cisco', 'vmware',
-            'infosys', 'tcs', 'wipro', 'cognizant', 'accenture', 'capgemini',
-            'deloitte', 'pwc', 'kpmg', 'ey', 'mckinsey', 'bain', 'bcg'
-        }
-        
-        # Resume section headers to exclude
-        section_headers = {
-            'profile', 'summary', 'objective', 'experience', 'education', 'skills',
-            'achievements', 'projects', 'certifications', 'awards', 'references',
-            'interests', 'hobbies', 'languages', 'career', 'professional', 'personal',
-            'work', 'employment', 'academic', 'qualifications', 'training', 'courses'
-        }
-        
         # Check if any word is a job title, technical term, location, company, or section header
+        exclusion_words = self.lexicon.name_exclusion_words
         for word in words:
-            word_lower = word.lower()
-            if (word_lower in job_titles or word_lower in tech_terms or 
-                word_lower in locations or word_lower in companies or 
-                word_lower in section_headers):
+            if word.lower() in exclusion_words:
                 return False
         
-        # Check for common section header patterns
-        name_lower = name.lower()
-        section_patterns = ['profile summary', 'career objective', 'work experience', 
-                           'professional experience', 'personal details', 'contact information']
-        if any(pattern in name_lower for pattern in section_patterns):
-            return False
-        
-        # Check for common location patterns
-        name_lower = name.lower()
-        if any(pattern in name_lower for pattern in ['west bengal', 'tamil nadu', 'andhra pradesh', 'madhya pradesh', 'uttar pradesh']):
+        # Check for common section header and multi-word location patterns
+        if self.lexicon.excluded_name_phrases.search(name.lower()):
             return False
         
         # Skip single words that are likely technical terms
@@ -314,27 +456,17 @@ class ResumeParser:
         
         # If formatted_text is available, select the name with the largest font size
         if formatted_text:
-            largest_font = -1
+            best_key = None
             best_name = None
             for name in filtered_names:
-                for text_chunk, format_info in formatted_text.items():
-                    if name.lower() in text_chunk.lower() or any(part.lower() in text_chunk.lower() for part in name.split()):
-                        font_size = format_info.get('font_size')
-                        if font_size is not None:
-                            try:
-                                font_size_val = float(font_size)
-                                if font_size_val > largest_font:
-                                    largest_font = font_size_val
-                                    best_name = name
-                                elif font_size_val == largest_font:
-                                    # If font size is the same, prefer the one earlier in the document
-                                    if best_name:
-                                        best_line = format_info.get('line_number', 999)
-                                        curr_line = format_info.get('line_number', 999)
-                                        if curr_line < best_line:
-                                            best_name = name
-                            except Exception:
-                                continue
+                font_size, line_number = formatted_text.largest_font(name)
+                if font_size is None:
+                    continue
+                # Larger font wins; on equal size prefer the name earlier in the document
+                key = (font_size, -line_number)
+                if best_key is None or key > best_key:
+                    best_key = key
+                    best_name = name
             if best_name:
                 return best_name
         
@@ -360,10 +492,10 @@ class ResumeParser:
                 score += 15
             
             # Prefer 10-digit numbers (standard mobile length)
-            digits_only = re.sub(r'[^\d]', '', phone)
-            if len(digits_only) == 10:
+            digit_count = len(digits_only(phone))
+            if digit_count == 10:
                 score += 8
-            elif len(digits_only) == 13 and phone.startswith('+91'):  # +91 + 10 digits
+            elif digit_count == 13 and phone.startswith('+91'):  # +91 + 10 digits
                 score += 12
             
             # Avoid numbers that look like decimals or coordinates
@@ -408,28 +540,11 @@ class ResumeParser:
     
     def extract_emails_aggressive(self, text):
         """More aggressive email extraction for hard-to-parse documents"""
-        emails = []
-        
-        # Multiple patterns for different email formats
-        patterns = [
-            r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b',  # Standard
-            r'[A-Za-z0-9._%+-]+\s*@\s*[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}',  # With spaces
-            r'[A-Za-z0-9._%+-]+\s*\[\s*at\s*\]\s*[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}',  # [at] format
-        ]
-        
-        for pattern in patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            emails.extend(matches)
-        
-        # Clean up emails
+        # Include spaced and [at]/(at) obfuscated addresses, already normalized by the scanner
         cleaned_emails = []
-        for email in emails:
-            # Remove spaces and normalize
-            cleaned = re.sub(r'\s+', '', email)
-            cleaned = cleaned.replace('[at]', '@').replace('(at)', '@')
-            
-            if self.is_valid_personal_email(cleaned):
-                cleaned_emails.append(cleaned)
+        for token in scan_contacts(text):
+            if token.kind in ('email', 'obfuscated_email') and self.is_valid_personal_email(token.normalized):
+                cleaned_emails.append(token.normalized)
         
         return list(set(cleaned_emails))
     
@@ -482,24 +597,11 @@ class ResumeParser:
     
     def extract_phones_aggressive(self, text):
         """More aggressive phone extraction for hard-to-parse documents"""
+        # Accept every phone-like token (including ones after "phone:", "mobile:" or "tel:")
         phones = []
-        
-        # More flexible patterns
-        patterns = [
-            r'(\+?\d{1,3}[-.\s]?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4})',  # Various formats
-            r'(\d{10})',  # Just 10 digits
-            r'(phone[:\s]*[\+\d\-\.\s\(\)]+)',  # After "phone:"
-            r'(mobile[:\s]*[\+\d\-\.\s\(\)]+)',  # After "mobile:"
-            r'(tel[:\s]*[\+\d\-\.\s\(\)]+)',  # After "tel:"
-        ]
-        
-        for pattern in patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            for match in matches:
-                # Clean and validate
-                cleaned = re.sub(r'[^\d+]', '', match)
-                if cleaned and len(cleaned) >= 10:
-                    phones.append(match.strip())
+        for token in scan_contacts(text):
+            if token.kind == 'phone' and len(token.normalized) >= 10:
+                phones.append(token.value)
         
         return list(set(phones))
     
@@ -573,226 +675,376 @@ class ResumeParser:
             return False
         
         # Extract only digits
-        digits_only = re.sub(r'[^\d]', '', phone)
+        digits = digits_only(phone)
         
         # Must have reasonable number of digits
-        if len(digits_only) < 10 or len(digits_only) > 15:
+        if len(digits) < 10 or len(digits) > 15:
             return False
         
         # Should not be all same digits
-        if len(set(digits_only)) <= 2:
+        if len(set(digits)) <= 2:
             return False
         
         # Should not be sequential (like 1234567890)
-        if digits_only in ['1234567890', '0123456789', '9876543210']:
+        if digits in ['1234567890', '0123456789', '9876543210']:
             return False
         
         # For Indian numbers, first digit after country code should be 6-9
-        if phone.startswith('+91') and len(digits_only) >= 11:
-            first_mobile_digit = digits_only[2]  # After +91
+        if phone.startswith('+91') and len(digits) >= 11:
+            first_mobile_digit = digits[2]  # After +91
             if first_mobile_digit not in '6789':
                 return False
-        elif len(digits_only) == 10:
-            first_digit = digits_only[0]
+        elif len(digits) == 10:
+            first_digit = digits[0]
             if first_digit not in '6789':
                 return False
         
         return True
 
-    def parse_document(self, file_path):
-        """Parse document using docling and extract text"""
+    def convert_document(self, source, max_pages=None):
+        """Convert a document (file path or DocumentSource) once with docling.
+        
+        Only the first max_pages pages are converted when it is set. Text, markdown and
+        formatting are derived lazily from the single conversion result.
+        """
         try:
-            result = self.converter.convert(file_path)
-            # Extract text from the document
-            if hasattr(result, 'text'):
-                text = result.text
-            elif hasattr(result, 'content'):
-                text = result.content
-            elif hasattr(result, 'document'):
-                text = str(result.document)
-            else:
-                text = str(result)
-            
-            return text
+            source = as_document_source(source)
+            options = {'page_range': (1, max_pages)} if max_pages else {}
+            with self._conversion_lock:
+                result = self.converter.convert(source.to_converter_input(), **options)
+            return ConvertedDocument(result, self)
         except Exception as e:
             raise Exception(f"Failed to parse document: {str(e)}")
     
-    def extract_document_text(self, file_path):
+    def parse_document(self, source):
+        """Parse document using docling and extract text"""
+        return self.convert_document(source).text
+    
+    def extract_document_text(self, source):
         """Extract plain text from document (fallback method)"""
         try:
-            result = self.converter.convert(file_path)
-            
-            # Extract plain text
-            if hasattr(result, 'document'):
-                text = result.document.export_to_markdown()
-            elif hasattr(result, 'text'):
-                text = result.text
-            elif hasattr(result, 'content'):
-                text = result.content
-            else:
-                text = str(result)
-            
-            return text
+            return self.convert_document(source).markdown
         except Exception as e:
             return ""
     
-    def extract_text_with_formatting(self, file_path):
+    def extract_text_with_formatting(self, source):
         """Extract text with formatting information like font sizes from document"""
-        try:
-            result = self.converter.convert(file_path)
-            
-            # Extract plain text
-            if hasattr(result, 'document'):
-                text = result.document.export_to_markdown()
-            elif hasattr(result, 'text'):
-                text = result.text
-            elif hasattr(result, 'content'):
-                text = result.content
-            else:
-                text = str(result)
-            
-            # Extract formatting information from docling result
-            formatted_text = {}
-            
-            # Try to get structured content with formatting if available
-            if hasattr(result, 'document') and result.document and hasattr(result.document, 'body') and result.document.body:
-                formatted_text = self._extract_formatting_from_docling_body(result.document.body.children, text)
-            
-            return text, formatted_text
-            
-        except Exception as e:
-            # Fallback to plain text extraction
-            text = self.parse_document(file_path)
-            return text, {}
+        text, formatted_text, _cache_status, _metadata = self.extract_text_with_formatting_cached(source)
+        return text, formatted_text
+    
+    def extract_text_with_formatting_cached(self, source, max_pages=None):
+        """Extract text and formatting, reusing a cached conversion of identical file bytes.
+        
+        With max_pages set, only the first max_pages pages of a PDF are converted.
+        Returns (text, formatted_text, cache_status, metadata) where cache_status is 'memory',
+        'disk', 'miss' or None when caching is disabled, and metadata holds the candidate
+        record fields describing the conversion.
+        """
+        cache_key = None
+        if self.cache is not None:
+            try:
+                # Conversions by different engines differ, so the engine setting is part of the key
+                cache_key = f'{as_document_source(source).sha256()}-{self.conversion_engine(source)}'
+                # A partial conversion is a different entry from the whole document
+                if max_pages and is_pdf(as_document_source(source)):
+                    cache_key += f'-p1-{max_pages}'
+                cached, tier = self.cache.get(cache_key)
+                if cached is not None:
+                    text, formatting, metadata = cached
+                    return text, LayoutIndex.from_dict(formatting), tier, metadata
+            except OSError as e:
+                print(f"Conversion cache lookup failed for {as_document_source(source).name}: {e}")
+        
+        if self.sandbox is not None:
+            text, formatting, converted, metadata = self.sandbox.convert(as_document_source(source), max_pages)
+            formatted_text = LayoutIndex.from_dict(formatting)
+        else:
+            text, formatted_text, converted, metadata = self._convert_text_with_formatting(source, max_pages)
+        
+        # Only complete conversions are cached, never the degraded fallback output
+        if cache_key is not None and converted:
+            self.cache.put(cache_key, text, formatted_text.to_dict(), metadata)
+        
+        return text, formatted_text, ('miss' if cache_key is not None else None), metadata
+    
+    def conversion_engine(self, source):
+        """Name of the engine configured for a document's format: 'pdf_text', 'ooxml' or 'docling'"""
+        source = as_document_source(source)
+        if self.pdf_engine == 'text' and is_pdf(source):
+            return 'pdf_text'
+        if self.docx_engine == 'ooxml' and is_docx(source):
+            return 'ooxml'
+        return 'docling'
+    
+    def _convert_text_with_formatting(self, source, max_pages=None):
+        """Convert a document, returning (text, formatted_text, fully_converted, metadata).
+        
+        PDFs with a usable text layer and DOCX files are read directly by the configured
+        engines; everything else, and anything those engines can't handle, goes through docling.
+        For PDFs, max_pages limits conversion to the first pages and the metadata records
+        how many pages were converted out of how many.
+        """
+        source = as_document_source(source)
+        metadata = {}
+        engine = self.conversion_engine(source)
+        if engine == 'pdf_text':
+            try:
+                text, formatted_text, pages_converted, total_pages = extract_pdf_text(
+                    source, self.pdf_text_quality, max_pages
+                )
+                return text, formatted_text, True, {
+                    'conversionEngine': engine, 'pagesConverted': pages_converted, 'totalPages': total_pages
+                }
+            except TextLayerRejected as e:
+                metadata['conversionFallbackReason'] = str(e)
+            except Exception as e:
+                print(f"Text layer extraction failed for {source.name}, using docling: {e}")
+                metadata['conversionFallbackReason'] = f'text layer unreadable: {e}'
+        elif engine == 'ooxml':
+            try:
+                text, formatted_text = extract_docx_text(source)
+                return text, formatted_text, True, {'conversionEngine': engine}
+            except Exception as e:
+                print(f"OOXML extraction failed for {source.name}, using docling: {e}")
+                metadata['conversionFallbackReason'] = str(e)
+        
+        pdf = is_pdf(source)
+        document = self.convert_document(source, max_pages if pdf else None)
+        text = document.markdown
+        formatted_text = document.formatting
+        metadata['conversionEngine'] = 'docling'
+        if pdf and document.total_pages:
+            metadata['totalPages'] = document.total_pages
+            metadata['pagesConverted'] = min(max_pages or document.total_pages, document.total_pages)
+        return text, formatted_text, not document.errors, metadata
     
-    def _extract_formatting_from_docling_body(self, elements, full_text):
-        """Extract formatting information from docling body elements"""
-        formatting_info = {}
+    def _extract_formatting_from_docling_body(self, elements, full_text, document=None):
+        """Extract formatting information from docling body elements into a LayoutIndex"""
+        formatting_info = LayoutIndex()
         line_number = 0
+        text_cursor = 0
         
         try:
-            for element in elements:
-                if hasattr(element, 'text') and element.text:
+            # Depth-first walk with an explicit stack of child iterators instead of recursion
+            stack = [iter(elements)]
+            while stack:
+                element = next(stack[-1], None)
+                if element is None:
+                    stack.pop()
+                    continue
+                
+                # Body children may be references into the document rather than the items themselves
+                if document is not None and hasattr(element, 'resolve') and not hasattr(element, 'text'):
+                    element = element.resolve(document)
+                
+                text = getattr(element, 'text', None)
+                if text:
                     # Track line position
-                    line_number += element.text.count('\n') + 1
+                    line_number += text.count('\n') + 1
                     
                     # Extract font size if available
                     font_size = None
-                    if hasattr(element, 'style') and element.style:
-                        if hasattr(element.style, 'font_size'):
-                            font_size = element.style.font_size
-                        elif hasattr(element.style, 'fontSize'):
-                            font_size = element.style.fontSize
+                    style = getattr(element, 'style', None)
+                    if style:
+                        if hasattr(style, 'font_size'):
+                            font_size = style.font_size
+                        elif hasattr(style, 'fontSize'):
+                            font_size = style.fontSize
                     
-                    # Store formatting info
-                    if element.text.strip():
-                        formatting_info[element.text.strip()] = {
-                            'line_number': line_number,
-                            'font_size': font_size,
-                            'position': 'early' if line_number <= 10 else 'later'
-                        }
-                        
-                # Recursively process nested elements
-                if hasattr(element, 'children') and element.children:
-                    nested_info = self._extract_formatting_from_docling_body(element.children, full_text)
-                    formatting_info.update(nested_info)
+                    # Store formatting info along with the element's offset in the full text
+                    stripped = text.strip()
+                    if stripped:
+                        offset = full_text.find(stripped, text_cursor)
+                        if offset >= 0:
+                            text_cursor = offset + len(stripped)
+                        formatting_info.add(stripped, line_number, font_size, offset)
+                
+                # Process nested elements
+                children = getattr(element, 'children', None)
+                if children:
+                    stack.append(iter(children))
                     
         except Exception as e:
-            # If formatting extraction fails, return empty dict
-            pass
+            # If formatting extraction fails, keep what was collected so far
+            print(f"Formatting extraction stopped early: {e}")
             
         return formatting_info
     
-    def extract_candidate_info(self, file_path, filename):
+    def extract_candidate_info(self, source, filename):
         """Extract all candidate information from a resume file"""
+        return self.extract_candidates_info([(source, filename)])[0]
+    
+    def extract_candidates_info(self, files):
+        """Extract candidate information from (source, filename) pairs, batching NER across documents.
+        
+        Each source is a file path or a DocumentSource. In progressive mode only the first
+        progressive_pages pages of each PDF are converted at first; the rest of a document
+        is converted only if a mandatory field is still missing or invalid.
+        """
+        results = [None] * len(files)
+        pending = []
+        for i, (source, filename) in enumerate(files):
+            try:
+                pending.append((i, as_document_source(source), filename))
+            except Exception as e:
+                results[i] = self._parse_error_result(filename, e)
+        
+        first_pass = self._extract_converted_batch(pending, results, self.progressive_pages or None)
+        
+        if self.progressive_pages:
+            escalate = [(i, source, filename) for i, source, filename in first_pass
+                        if self._needs_more_pages(results[i])]
+            if escalate:
+                # A failed full conversion must not cost the fields the first pages already gave
+                escalated = [None] * len(files)
+                converted = {i for i, _source, _filename in self._extract_converted_batch(escalate, escalated, None)}
+                for i, _source, _filename in escalate:
+                    if i in converted:
+                        results[i] = escalated[i]
+                        results[i]['conversionEscalated'] = True
+                    else:
+                        results[i]['escalationError'] = escalated[i]['failureReason']
+        
+        return results
+    
+    def _needs_more_pages(self, candidate):
+        """Whether a record from a partial conversion is missing fields the remaining pages may hold"""
+        pages_converted = candidate.get('pagesConverted')
+        total_pages = candidate.get('totalPages')
+        missing_field = not (candidate.get('fullName') and candidate.get('email') and candidate.get('contactNumber'))
+        return (missing_field
+                and pages_converted is not None and total_pages is not None
+                and pages_converted < total_pages)
+    
+    def _extract_converted_batch(self, files, results, max_pages):
+        """Convert (index, source, filename) triples and store their candidate records in results.
+        
+        Returns the triples whose records came from a successful conversion.
+        """
+        documents = []
+        for i, source, filename in files:
+            try:
+                # Parse document to get text and formatting information
+                text, formatted_text, cache_status, metadata = self.extract_text_with_formatting_cached(source, max_pages)
+                documents.append((i, source, filename, text, formatted_text, cache_status, metadata))
+            except Exception as e:
+                results[i] = self._parse_error_result(filename, e)
+        
+        # Names come from one batched cascade run over every converted document
         try:
-            # Parse document to get text and formatting information
-            text, formatted_text = self.extract_text_with_formatting(file_path)
-            
-            # Extract information with multiple attempts, prioritizing font size and early position
-            names = self.extract_names_with_font_priority(text, formatted_text)
-            emails = self.extract_email_addresses(text)
-            phones = self.extract_phone_numbers(text)
-            
-            # Try harder to find missing email and phone information
-            if not emails:
-                emails = self.extract_emails_aggressive(text)
-            
-            if not phones:
-                phones = self.extract_phones_aggressive(text)
-            
-            # Select best candidates for each field
-            full_name = self.select_best_name(names, formatted_text)
-            email = self.select_best_email(emails)
-            contact_number = self.select_best_phone(phones)
-            
-            # Validate the extracted information
-            valid_name = self.validate_extracted_name(full_name)
-            valid_email = self.validate_extracted_email(email)
-            valid_phone = self.validate_extracted_phone(contact_number)
-            
-            candidate_details = {
-                'fileName': filename,
-                'fullName': full_name if valid_name else None,
-                'email': email if valid_email else None,
-                'contactNumber': contact_number if valid_phone else None,
-                'allNames': names,
-                'allEmails': emails,
-                'allPhones': phones,
-                'rawText': text,
-                'parseStatus': 'success',
-                'uploadTimestamp': datetime.now().isoformat(),
-                'id': str(uuid.uuid4())
-            }
-            
-            # Check if all mandatory fields are extracted AND valid
-            missing_fields = []
-            if not valid_name or not full_name:
-                missing_fields.append('Valid Full Name')
-            if not valid_email or not email:
-                missing_fields.append('Valid Email')
-            if not valid_phone or not contact_number:
-                missing_fields.append('Valid Contact Number')
-            
-            if missing_fields:
-                candidate_details['parseStatus'] = 'failed'
-                candidate_details['failureReason'] = f'Missing or invalid mandatory fields: {", ".join(missing_fields)}'
-                # Set invalid fields to None
-                if not valid_name:
-                    candidate_details['fullName'] = None
-                if not valid_email:
-                    candidate_details['email'] = None
-                if not valid_phone:
-                    candidate_details['contactNumber'] = None
-            
-            return candidate_details
-            
+            name_results = self.extract_names_cascade_batch([document[3] for document in documents])
         except Exception as e:
-            return {
-                'fileName': filename,
-                'parseStatus': 'failed',
-                'failureReason': f'Parse error: {str(e)}',
-                'uploadTimestamp': datetime.now().isoformat(),
-                'id': str(uuid.uuid4())
-            }
-
-    def extract_names_with_font_priority(self, text, formatted_text=None):
-        """Extract names with font size and position prioritization"""
+            print(f"Error in batched name extraction: {e}")
+            name_results = [None] * len(documents)
+        
+        converted = []
+        for (i, source, filename, text, formatted_text, cache_status, metadata), name_result in zip(documents, name_results):
+            try:
+                results[i] = self._build_candidate_details(filename, text, formatted_text, cache_status, name_result)
+                # How the document was converted: engine, pages and, when docling was a fallback, why
+                results[i].update(metadata)
+                # Hash of the uploaded bytes (already known from upload or the cache lookup)
+                results[i]['contentHash'] = source.sha256()
+                converted.append((i, source, filename))
+            except Exception as e:
+                results[i] = self._parse_error_result(filename, e)
+        
+        return converted
+    
+    def _parse_error_result(self, filename, error):
+        """Build the failed candidate record for a file that could not be parsed"""
+        result = {
+            'fileName': filename,
+            'parseStatus': 'failed',
+            'failureReason': f'Parse error: {str(error)}',
+            'uploadTimestamp': datetime.now().isoformat(),
+            'id': str(uuid.uuid4())
+        }
+        if isinstance(error, ConversionCancelled):
+            # The sandbox killed the conversion: 'timeout', 'memory' or 'crashed'
+            result['failureReason'] = f'{error.reason.capitalize()}: {str(error)}'
+            result['failureCode'] = error.reason
+        return result
+    
+    def _build_candidate_details(self, filename, text, formatted_text, cache_status, name_result=None):
+        """Extract and validate the candidate fields of one converted document"""
+        # Extract information with multiple attempts, prioritizing font size and early position
+        names, name_tier = self.extract_names_with_font_priority(text, formatted_text, name_result)
+        emails = self.extract_email_addresses(text)
+        phones = self.extract_phone_numbers(text)
+        
+        # Try harder to find missing email and phone information
+        if not emails:
+            emails = self.extract_emails_aggressive(text)
+        
+        if not phones:
+            phones = self.extract_phones_aggressive(text)
+        
+        # Select best candidates for each field
+        full_name = self.select_best_name(names, formatted_text)
+        email = self.select_best_email(emails)
+        contact_number = self.select_best_phone(phones)
+        
+        # Validate the extracted information
+        valid_name = self.validate_extracted_name(full_name)
+        valid_email = self.validate_extracted_email(email)
+        valid_phone = self.validate_extracted_phone(contact_number)
+        
+        candidate_details = {
+            'fileName': filename,
+            'fullName': full_name if valid_name else None,
+            'email': email if valid_email else None,
+            'contactNumber': contact_number if valid_phone else None,
+            'allNames': names,
+            'allEmails': emails,
+            'allPhones': phones,
+            'rawText': text,
+            'parseStatus': 'success',
+            'conversionCache': cache_status,
+            'nameTier': name_tier,
+            'uploadTimestamp': datetime.now().isoformat(),
+            'id': str(uuid.uuid4())
+        }
+        
+        # Check if all mandatory fields are extracted AND valid
+        missing_fields = []
+        if not valid_name or not full_name:
+            missing_fields.append('Valid Full Name')
+        if not valid_email or not email:
+            missing_fields.append('Valid Email')
+        if not valid_phone or not contact_number:
+            missing_fields.append('Valid Contact Number')
+        
+        if missing_fields:
+            candidate_details['parseStatus'] = 'failed'
+            candidate_details['failureReason'] = f'Missing or invalid mandatory fields: {", ".join(missing_fields)}'
+            # Set invalid fields to None
+            if not valid_name:
+                candidate_details['fullName'] = None
+            if not valid_email:
+                candidate_details['email'] = None
+            if not valid_phone:
+                candidate_details['contactNumber'] = None
+        
+        return candidate_details
+
+    def extract_names_with_font_priority(self, text, formatted_text=None, name_result=None):
+        """Extract names with font size and position prioritization.
+        
+        name_result is an already computed (names, tier) cascade result for the text.
+        Returns (names, tier) where tier names the extraction step that found them.
+        """
         names = []
         
-        # Start with regular name extraction
-        regular_names = self.extract_names(text)
+        # Start with the tiered name extraction
+        regular_names, tier = name_result or self.extract_names_cascade(text)
         names.extend(regular_names)
         
         # Add aggressive extraction if needed
         if not names:
             aggressive_names = self.extract_names_aggressive(text)
             names.extend(aggressive_names)
-        
-        # Add fallback extraction
-        if not names:
-            fallback_names = self.extract_names_fallback(text)
-            names.extend(fallback_names)
+            tier = 'aggressive' if aggressive_names else None
         
         # Enhance names with formatting information
         if formatted_text:
@@ -806,13 +1058,13 @@ class ResumeParser:
                     'score': 0
                 }
                 
-                # Look for formatting information
-                for text_chunk, format_info in formatted_text.items():
-                    if name.lower() in text_chunk.lower() or any(part.lower() in text_chunk.lower() for part in name.split()):
-                        name_info['font_size'] = format_info.get('font_size')
-                        name_info['line_number'] = format_info.get('line_number', 999)
-                        name_info['is_early'] = format_info.get('position') == 'early'
-                        break
+                # Look up the earliest element containing the name through the token index
+                element_id = formatted_text.first_element(name)
+                if element_id is not None:
+                    format_info = formatted_text.element_info(element_id)
+                    name_info['font_size'] = format_info['font_size']
+                    name_info['line_number'] = format_info['line_number']
+                    name_info['is_early'] = format_info['position'] == 'early'
                 
                 # Calculate priority score
                 name_info['score'] = self._calculate_name_score(name_info, text)
@@ -820,9 +1072,9 @@ class ResumeParser:
             
             # Sort by score (highest first) and return name strings
             enhanced_names.sort(key=lambda x: x['score'], reverse=True)
-            return [info['name'] for info in enhanced_names]
+            return [info['name'] for info in enhanced_names], tier
         
-        return names
+        return names, tier
     
     def _calculate_name_score(self, name_info, full_text):
         """Calculate priority score for a name based on various factors"""
@@ -958,112 +1210,481 @@ def remove_duplicates_by_email(candidates):
     
     return list(email_map.values())
 
-def extract_files_from_zip(zip_path, extract_to_dir):
-    """Extract supported files from ZIP archive"""
-    extracted_files = []
-    
+# Initialize parser
+conversion_cache = ConversionCache(
+    cache_dir=app.config['CONVERSION_CACHE_DIR'],
+    max_memory_entries=app.config['CONVERSION_CACHE_MEMORY_ENTRIES'],
+    max_disk_bytes=app.config['CONVERSION_CACHE_DISK_BYTES']
+)
+
+def create_parser(**options):
+    """Build a parser with the configured conversion engines; sandbox processes use one with no options"""
+    return ResumeParser(
+        name_header_lines=app.config['NAME_HEADER_LINES'],
+        pdf_engine=app.config['PDF_ENGINE'],
+        docx_engine=app.config['DOCX_ENGINE'],
+        pdf_text_quality=TextLayerQuality(
+            min_chars_per_page=app.config['PDF_TEXT_MIN_CHARS_PER_PAGE'],
+            max_bad_char_ratio=app.config['PDF_TEXT_MAX_BAD_CHAR_RATIO'],
+            min_word_ratio=app.config['PDF_TEXT_MIN_WORD_RATIO'],
+            max_avg_word_length=app.config['PDF_TEXT_MAX_AVG_WORD_LENGTH']
+        ),
+        **options
+    )
+
+conversion_sandbox = None
+if app.config['CONVERSION_SANDBOX']:
+    conversion_sandbox = SandboxPool(
+        app.config['CONVERSION_SANDBOXES'],
+        create_parser,
+        timeout=app.config['CONVERSION_TIMEOUT_SECONDS'],
+        memory_limit_bytes=app.config['CONVERSION_MEMORY_LIMIT_BYTES'],
+        max_documents=app.config['CONVERSION_MAX_DOCUMENTS']
+    )
+
+parser = create_parser(
+    cache=conversion_cache,
+    progressive_pages=app.config['PROGRESSIVE_PAGES'],
+    sandbox=conversion_sandbox
+)
+
+# Batch statistics aggregated from candidate records, so pool workers are counted too
+processing_stats = Counter()
+
+def record_processing_stats(candidates):
+    """Accumulate per-record statistics (triage verdict, lane, conversion engine, pages and cache tier, name tier) for the /stats endpoint"""
+    for candidate in candidates:
+        if candidate.get('triage'):
+            processing_stats[f"triage:{candidate['triage']['verdict']}"] += 1
+        if candidate.get('conversionEngine'):
+            processing_stats[f"conversionEngine:{candidate['conversionEngine']}"] += 1
+            if candidate.get('conversionFallbackReason'):
+                processing_stats['conversionFallbacks'] += 1
+        if candidate.get('lane'):
+            processing_stats[f"lane:{candidate['lane']}"] += 1
+        if candidate.get('failureCode'):
+            processing_stats[f"conversionCancelled:{candidate['failureCode']}"] += 1
+        if candidate.get('totalPages'):
+            processing_stats['pagesConverted'] += candidate.get('pagesConverted') or 0
+            processing_stats['totalPages'] += candidate['totalPages']
+            if candidate.get('conversionEscalated'):
+                processing_stats['conversionEscalations'] += 1
+        if 'nameTier' in candidate:
+            processing_stats[f"nameTier:{candidate['nameTier'] or 'none'}"] += 1
+        cache_status = candidate.get('conversionCache')
+        if cache_status == 'memory':
+            processing_stats['conversionCacheMemoryHits'] += 1
+        elif cache_status == 'disk':
+            processing_stats['conversionCacheDiskHits'] += 1
+        elif cache_status == 'miss':
+            processing_stats['conversionCacheMisses'] += 1
+
+# Model warm-up state reported by /ready
+warm_up_state = {'status': 'cold', 'error': None, 'durationSeconds': None}
+
+def warm_up_parser():
+    """Load the parser's models, recording progress for the readiness probe"""
+    warm_up_state.update(status='warming', error=None)
+    started = time.monotonic()
     try:
-        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-            # Get list of files in the ZIP
-            file_list = zip_ref.namelist()
-            
-            for file_name in file_list:
-                # Skip directories and hidden files
-                if file_name.endswith('/') or file_name.startswith('.') or '/' in file_name[:-1]:
-                    continue
-                
-                # Check if file has supported extension
-                if any(file_name.lower().endswith(ext) for ext in ['.pdf', '.doc', '.docx']):
-                    try:
-                        # Extract individual file
-                        zip_ref.extract(file_name, extract_to_dir)
-                        extracted_file_path = os.path.join(extract_to_dir, file_name)
-                        
-                        # Verify the file was extracted and is readable
-                        if os.path.exists(extracted_file_path) and os.path.getsize(extracted_file_path) > 0:
-                            extracted_files.append({
-                                'path': extracted_file_path,
-                                'original_name': file_name,
-                                'size': os.path.getsize(extracted_file_path)
-                            })
-                        
-                    except Exception as e:
-                        print(f"Failed to extract {file_name}: {str(e)}")
-                        continue
-        
-        return extracted_files
-        
-    except zipfile.BadZipFile:
-        raise Exception("Invalid ZIP file format")
+        parser.warm_up()
+        if app.config['PARSER_WORKERS'] > 1:
+            # Start the pool now; its workers warm up through their initializer
+            get_parser_pool()
+        warm_up_state['status'] = 'ready'
     except Exception as e:
-        raise Exception(f"Failed to extract ZIP file: {str(e)}")
+        print(f"Model warm-up failed: {e}")
+        warm_up_state.update(status='failed', error=str(e))
+    warm_up_state['durationSeconds'] = round(time.monotonic() - started, 3)
 
-def process_zip_file(zip_file_path, original_filename):
-    """Process a ZIP file containing multiple resumes"""
-    temp_extract_dir = None
-    results = []
+def start_warm_up():
+    """Warm up the parser on a background thread"""
+    threading.Thread(target=warm_up_parser, name='warm-up', daemon=True).start()
+
+# Background startup work runs once in each process that serves requests. It is never started
+# on import: sandbox and parser pool processes, scripts and tests import this module too.
+_startup_lock = threading.Lock()
+_startup_done = False
+
+def run_startup_tasks():
+    """Start model warm-up and resume jobs interrupted by a restart, once per process"""
+    global _startup_done
+    with _startup_lock:
+        if _startup_done:
+            return
+        _startup_done = True
+    if app.config['WARM_UP_ON_START']:
+        start_warm_up()
+    try:
+        resume_unfinished_jobs()
+    except Exception as e:
+        print(f"Error resuming unfinished jobs: {e}")
+
+# Process pool used when PARSER_WORKERS > 1
+_parser_pool = None
+
+def _init_parser_worker():
+    """Warm up the parser owned by a pool worker process"""
+    # Workers are spawned, so each one imports this module and owns its own parser
+    try:
+        parser.warm_up()
+    except Exception as e:
+        print(f"Failed to warm up parser worker: {e}")
+
+def _parse_in_worker(source, filename):
+    """Parse a single resume inside a pool worker process"""
+    return parser.extract_candidate_info(source, filename)
+
+def _parse_batch_in_worker(files):
+    """Parse (source, filename) pairs inside a pool worker process"""
+    return parser.extract_candidates_info(files)
+
+def get_parser_pool():
+    """Return the shared parser process pool, creating it on first use"""
+    global _parser_pool
+    if _parser_pool is None:
+        _parser_pool = ProcessPoolExecutor(
+            max_workers=app.config['PARSER_WORKERS'],
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_parser_worker
+        )
+    return _parser_pool
+
+def _reset_parser_pool():
+    """Drop a broken parser pool so the next batch starts a fresh one"""
+    global _parser_pool
+    if _parser_pool is not None:
+        _parser_pool.shutdown(wait=False, cancel_futures=True)
+        _parser_pool = None
+
+def processing_error_result(filename, error):
+    """Build the failed candidate record for a file that could not be processed"""
+    return {
+        'fileName': filename,
+        'parseStatus': 'failed',
+        'failureReason': f'Processing error: {str(error)}',
+        'uploadTimestamp': datetime.now().isoformat(),
+        'id': str(uuid.uuid4())
+    }
+
+def triage_file(file_info):
+    """Triage an uploaded file before conversion, keeping the verdict on its file info"""
+    if 'triage' not in file_info:
+        try:
+            file_info['triage'] = triage_document(
+                file_info['source'], app.config['TRIAGE_MAX_PAGES'], app.config['TRIAGE_SOFT_MAX_PAGES']
+            )
+        except Exception as e:
+            # Triage is only an optimization; a file it can't inspect is converted as usual
+            print(f"Error triaging {file_info['name']}: {e}")
+            file_info['triage'] = None
+    return file_info['triage']
+
+def triage_rejected_result(filename, triage):
+    """Build the failed candidate record for a file rejected before conversion"""
+    return {
+        'fileName': filename,
+        'parseStatus': 'failed',
+        'failureReason': f"Rejected before conversion: {'; '.join(triage['reasons'])}",
+        'triage': triage,
+        'uploadTimestamp': datetime.now().isoformat(),
+        'id': str(uuid.uuid4())
+    }
+
+def schedule_file(file_info):
+    """Classify a triaged file by expected conversion cost, returning (lane, cost)"""
+    return estimate_cost(
+        file_info.get('triage'),
+        pdf_engine=app.config['PDF_ENGINE'],
+        docx_engine=app.config['DOCX_ENGINE'],
+        max_pages=app.config['PROGRESSIVE_PAGES']
+    )
+
+# Threads running in-process parsing for both scheduler lanes
+_lane_executor = None
+
+def get_lane_executor():
+    """Return the thread pool shared by the fast and heavy lanes, creating it on first use"""
+    global _lane_executor
+    if _lane_executor is None:
+        _lane_executor = ThreadPoolExecutor(
+            max_workers=app.config['FAST_LANE_WORKERS'] + app.config['HEAVY_LANE_WORKERS'],
+            thread_name_prefix='lane'
+        )
+    return _lane_executor
+
+def _parse_batch(files):
+    """Parse a list of file infos in-process, one failed record each if the batch fails"""
+    try:
+        return parser.extract_candidates_info([(f['source'], f['name']) for f in files])
+    except Exception as e:
+        print(f"Error processing batch of {len(files)} files: {e}")
+        return [processing_error_result(f['name'], e) for f in files]
+
+def iter_parsed_files(files_to_process, batch_size=None):
+    """Parse resume files, yielding (index, candidate record) as each file finishes.
     
+    Every file is triaged first: rejected files get a failed record without being
+    converted. The rest are classified by expected cost; cheap documents (text-layer
+    PDFs, DOCX) run on a fast lane, cheapest first, while documents needing docling or
+    OCR run on a heavy lane limited to HEAVY_LANE_WORKERS at a time, so a few slow files
+    can't hold up the rest of the batch. In-process parsing handles batch_size fast
+    files at a time (default NLP_BATCH_SIZE) so NER is batched across documents; pass 1
+    to get every record as early as possible.
+    """
+    lanes = {FAST_LANE: [], HEAVY_LANE: []}
+    for index, file_info in enumerate(files_to_process):
+        triage = triage_file(file_info)
+        if triage and triage['verdict'] == TRIAGE_REJECT:
+            candidate = triage_rejected_result(file_info['name'], triage)
+            record_processing_stats([candidate])
+            yield index, candidate
+            continue
+        lane, cost = schedule_file(file_info)
+        file_info['lane'] = lane
+        # Deprioritized files go last in their lane; otherwise shortest expected work first
+        deprioritized = bool(triage and triage['verdict'] == TRIAGE_DEPRIORITIZE)
+        lanes[lane].append((deprioritized, cost, index))
+    
+    for lane_files in lanes.values():
+        lane_files.sort()
+    fast_indices = [index for _deprioritized, _cost, index in lanes[FAST_LANE]]
+    heavy_indices = [index for _deprioritized, _cost, index in lanes[HEAVY_LANE]]
+    
+    if app.config['PARSER_WORKERS'] <= 1:
+        batch_size = max(batch_size or app.config['NLP_BATCH_SIZE'], 1)
+        executor = get_lane_executor()
+        heavy_limit = app.config['HEAVY_LANE_WORKERS']
+        submit = lambda task: executor.submit(_parse_batch, [files_to_process[i] for i in task])
+    else:
+        # Each pool task is a single file, so files spread across the worker processes
+        batch_size = 1
+        pool = get_parser_pool()
+        # Leave at least one worker process for the fast lane
+        heavy_limit = max(min(app.config['HEAVY_LANE_WORKERS'], app.config['PARSER_WORKERS'] - 1), 1)
+        submit = lambda task: pool.submit(_parse_batch_in_worker,
+                                          [(files_to_process[i]['source'], files_to_process[i]['name']) for i in task])
+    
+    fast_tasks = [fast_indices[start:start + batch_size] for start in range(0, len(fast_indices), batch_size)]
+    # Heavy files are parsed one at a time; batching them would make cheap NER wait on slow conversions
+    heavy_tasks = [[index] for index in heavy_indices]
+    
+    pool_broken = False
     try:
-        # Create temporary directory for extraction
-        temp_extract_dir = tempfile.mkdtemp()
-        
-        # Extract files from ZIP
-        extracted_files = extract_files_from_zip(zip_file_path, temp_extract_dir)
-        
-        if not extracted_files:
-            return [{
-                'fileName': original_filename,
-                'parseStatus': 'failed',
-                'failureReason': 'No supported files found in ZIP archive',
-                'uploadTimestamp': datetime.now().isoformat(),
-                'id': str(uuid.uuid4())
-            }]
-        
-        # Process each extracted file
-        for file_info in extracted_files:
+        for task, future in run_lanes(fast_tasks, heavy_tasks, submit, heavy_limit):
             try:
-                # Process the resume file
-                result = parser.extract_candidate_info(file_info['path'], file_info['original_name'])
-                
-                # Add ZIP source information
-                result['sourceZip'] = original_filename
-                result['extractedFrom'] = 'ZIP'
-                
-                results.append(result)
-                
+                candidates = future.result()
             except Exception as e:
-                # Add failed result for this file
-                results.append({
-                    'fileName': file_info['original_name'],
-                    'sourceZip': original_filename,
-                    'extractedFrom': 'ZIP',
-                    'parseStatus': 'failed',
-                    'failureReason': f'Parse error: {str(e)}',
-                    'uploadTimestamp': datetime.now().isoformat(),
-                    'id': str(uuid.uuid4())
-                })
-        
-        return results
-        
+                # A crashed worker breaks the pool; the affected files are reported as failed
+                if isinstance(e, BrokenProcessPool):
+                    pool_broken = True
+                print(f"Error processing {', '.join(files_to_process[i]['name'] for i in task)}: {e}")
+                candidates = [processing_error_result(files_to_process[i]['name'], e) for i in task]
+            
+            for index, candidate in zip(task, candidates):
+                file_info = files_to_process[index]
+                candidate['triage'] = file_info['triage']
+                candidate['lane'] = file_info['lane']
+            record_processing_stats(candidates)
+            for index, candidate in zip(task, candidates):
+                yield index, candidate
+    finally:
+        if pool_broken:
+            _reset_parser_pool()
+
+def parse_files(files_to_process):
+    """Parse resume files, returning candidate records in submission order"""
+    parsed_candidates = [None] * len(files_to_process)
+    for index, candidate in iter_parsed_files(files_to_process):
+        parsed_candidates[index] = candidate
+    return parsed_candidates
+
+# Parsed candidates are kept so they can be looked up, corrected and exported by id
+candidate_store = CandidateStore(os.path.join(app.config['DATA_FOLDER'], 'candidates.sqlite3'))
+search_index = SearchIndex(app.config['SEARCH_INDEX_DIR'], merge_factor=app.config['SEARCH_MERGE_FACTOR'])
+near_duplicate_index = NearDuplicateIndex(
+    os.path.join(app.config['DATA_FOLDER'], 'near_duplicates.sqlite3'),
+    threshold=app.config['NEAR_DUPLICATE_THRESHOLD']
+)
+identity_index = IdentityIndex(
+    os.path.join(app.config['DATA_FOLDER'], 'identities.sqlite3'),
+    default_country_code=app.config['DEFAULT_PHONE_COUNTRY_CODE']
+)
+
+# Record fields set by identity resolution
+IDENTITY_FIELDS = ('personId', 'mergedWith')
+
+def resolve_identities(candidates):
+    """Set each candidate's 'personId' and the ids of the other records of that person in 'mergedWith'"""
+    resolved = identity_index.resolve(candidates)
+    for candidate in candidates:
+        candidate.update(resolved[candidate['id']])
+
+def mark_near_duplicates(candidates):
+    """Record in each candidate's 'nearDuplicates' the earlier or same-batch resumes it nearly duplicates"""
+    by_id = {c['id']: c for c in candidates}
+    matches = near_duplicate_index.add((c['id'], c['rawText']) for c in candidates if c.get('rawText'))
+    for candidate_id, other, score in matches:
+        for record_id, duplicate_id in ((candidate_id, other), (other, candidate_id)):
+            if record_id in by_id:
+                by_id[record_id].setdefault('nearDuplicates', []).append(
+                    {'id': duplicate_id, 'similarity': round(score, 3)}
+                )
+
+def near_duplicate_clusters(candidates):
+    """Cluster the near duplicates recorded on a batch's candidates"""
+    pairs = {}
+    for c in candidates:
+        for match in c.get('nearDuplicates', []):
+            # Pairs within the batch are recorded on both candidates; count them once
+            pairs.setdefault(frozenset((c['id'], match['id'])), (c['id'], match['id'], match['similarity']))
+    return duplicate_clusters(list(pairs.values()))
+
+def store_candidates(candidates, batch_id):
+    """Resolve a batch's people and near duplicates, then persist its candidate records and index their text.
+    
+    A failure in any step doesn't fail the upload.
+    """
+    try:
+        resolve_identities(candidates)
     except Exception as e:
-        return [{
-            'fileName': original_filename,
-            'parseStatus': 'failed',
-            'failureReason': f'ZIP processing error: {str(e)}',
-            'uploadTimestamp': datetime.now().isoformat(),
-            'id': str(uuid.uuid4())
-        }]
+        print(f"Error resolving identities of batch {batch_id}: {e}")
+    try:
+        mark_near_duplicates(candidates)
+    except Exception as e:
+        print(f"Error checking batch {batch_id} for near duplicates: {e}")
+    try:
+        candidate_store.upsert_many(candidates, batch_id)
+    except Exception as e:
+        print(f"Error storing candidates of batch {batch_id}: {e}")
+    try:
+        search_index.add((c['id'], c['rawText']) for c in candidates if c.get('rawText'))
+    except Exception as e:
+        print(f"Error indexing candidates of batch {batch_id}: {e}")
+
+# Background job execution
+job_store = JobStore(os.path.join(app.config['DATA_FOLDER'], 'jobs.sqlite3'), lease_seconds=app.config['JOB_LEASE_SECONDS'])
+_job_executor = None
+
+def get_job_executor():
+    """Return the thread pool that runs batch job files, creating it on first use"""
+    global _job_executor
+    if _job_executor is None:
+        _job_executor = ThreadPoolExecutor(max_workers=app.config['JOB_WORKERS'], thread_name_prefix='job')
+    return _job_executor
+
+# Job threads take a slot before parsing a heavy-lane file, bounding the heavy lane for jobs too
+_heavy_job_slots = threading.BoundedSemaphore(max(app.config['HEAVY_LANE_WORKERS'], 1))
+
+def _run_job_file(job_id, seq, file_info):
+    """Parse one file of a batch job and persist its result, unless another process has claimed it"""
+    if not job_store.claim(job_id, seq):
+        return
+    source = None
+    triage = None
+    try:
+        # Everything after the claim can fail; the file still gets a (failed) result, so its job finishes
+        source = DocumentSource.from_path(file_info['path'], file_info['name'], owns_path=True)
+        job_file = {'name': file_info['name'], 'source': source}
+        if 'triage' in file_info:
+            job_file['triage'] = file_info['triage']
+        triage = triage_file(job_file)
+        lane, _cost = schedule_file(job_file)
+        if triage and triage['verdict'] == TRIAGE_REJECT:
+            result = triage_rejected_result(file_info['name'], triage)
+        else:
+            if lane == HEAVY_LANE:
+                _heavy_job_slots.acquire()
+            try:
+                if app.config['PARSER_WORKERS'] > 1:
+                    result = get_parser_pool().submit(_parse_in_worker, source, file_info['name']).result()
+                else:
+                    result = parser.extract_candidate_info(source, file_info['name'])
+            finally:
+                if lane == HEAVY_LANE:
+                    _heavy_job_slots.release()
+            result['lane'] = lane
+    except Exception as e:
+        if isinstance(e, BrokenProcessPool):
+            _reset_parser_pool()
+        print(f"Error processing {file_info['name']}: {e}")
+        result = processing_error_result(file_info['name'], e)
     
+    try:
+        result['triage'] = triage
+        record_processing_stats([result])
+        # The job ID doubles as the batch ID of its candidates
+        store_candidates([result], job_id)
     finally:
-        # Clean up temporary directory
-        if temp_extract_dir and os.path.exists(temp_extract_dir):
-            try:
-                shutil.rmtree(temp_extract_dir)
-            except Exception as e:
-                print(f"Failed to clean up temporary directory: {str(e)}")
+        job_store.mark_done(job_id, seq, result)
+        if source is not None:
+            source.cleanup()
 
-# Initialize parser
-parser = ResumeParser()
+def submit_batch_job(job_id, files_to_process):
+    """Persist a new job and queue its files on the background worker pool, cheapest first"""
+    job_store.create_job(job_id, files_to_process)
+    executor = get_job_executor()
+    queue_order = sorted(range(len(files_to_process)),
+                         key=lambda seq: _job_queue_key(files_to_process[seq]))
+    for seq in queue_order:
+        executor.submit(_run_job_file, job_id, seq, files_to_process[seq])
+
+def _job_queue_key(file_info):
+    """Sort key queueing fast-lane files before heavy ones, each in order of expected cost"""
+    lane, cost = schedule_file(file_info)
+    return (lane != FAST_LANE, cost)
+
+def resume_unfinished_jobs():
+    """Queue the files of jobs interrupted by a restart: queued files and running ones whose lease expired.
+
+    Other processes may queue the same files; each file is parsed by whichever claims it first.
+    """
+    executor = get_job_executor()
+    unfinished = job_store.claimable_files()
+    for file_info in unfinished:
+        if os.path.exists(file_info['path']):
+            executor.submit(_run_job_file, file_info['jobId'], file_info['seq'], file_info)
+        elif job_store.claim(file_info['jobId'], file_info['seq']):
+            job_store.mark_done(file_info['jobId'], file_info['seq'],
+                                processing_error_result(file_info['name'], 'Uploaded file is no longer available'))
+    if unfinished:
+        print(f"Resumed {len(unfinished)} unfinished job files")
+
+# Candidate fields left out of responses unless asked for with ?fields=; the text is served by /candidates/<id>/text
+LAZY_CANDIDATE_FIELDS = ('rawText',)
+
+def requested_fields():
+    """Parse ?fields= into the candidate fields to return; None means every field but the lazy ones"""
+    fields = request.args.get('fields')
+    if not fields:
+        return None
+    return {field.strip() for field in fields.split(',') if field.strip()}
+
+def project_candidate(candidate, fields):
+    """Keep the requested fields of a candidate record (and always its id); '*' keeps everything"""
+    if fields is None:
+        return {key: value for key, value in candidate.items() if key not in LAZY_CANDIDATE_FIELDS}
+    if '*' in fields:
+        return candidate
+    return {key: value for key, value in candidate.items() if key in fields or key == 'id'}
+
+def wants_text(fields):
+    return fields is not None and ('*' in fields or 'rawText' in fields)
+
+@app.after_request
+def compress_json_response(response):
+    """Gzip large JSON responses for clients that accept gzip"""
+    if (response.mimetype != 'application/json' or response.is_streamed or response.direct_passthrough
+            or 'Content-Encoding' in response.headers
+            or 'gzip' not in request.headers.get('Accept-Encoding', '')):
+        return response
+    data = response.get_data()
+    if len(data) < app.config['GZIP_MIN_BYTES']:
+        return response
+    response.set_data(gzip.compress(data, compresslevel=app.config['GZIP_LEVEL']))
+    response.headers['Content-Encoding'] = 'gzip'
+    response.vary.add('Accept-Encoding')
+    return response
 
 @app.route('/Picture', methods=['GET'])
 def picture_route():
@@ -1080,31 +1701,152 @@ def upload_single_document():
         if file.filename == '':
             return jsonify({'error': 'No file selected'}), 400
         
-        # Save file temporarily
-        temp_path = os.path.join(app.config['UPLOAD_FOLDER'], file.filename)
-        file.save(temp_path)
+        source = read_upload(file, app.config['UPLOAD_FOLDER'])
         
         try:
-            # Parse document
-            text = parser.parse_document(temp_path)
-            
-            # Clean up
-            os.remove(temp_path)
-            
+            # Same conversion path as batch uploads: cached, and sandboxed when the sandbox is enabled
+            text, _formatted_text, _cache_status, metadata = parser.extract_text_with_formatting_cached(source)
+
             return jsonify({
                 'text': text,
-                'info': {'filename': file.filename}
+                'info': {'filename': file.filename, **metadata}
             })
-            
-        except Exception as e:
-            # Clean up on error
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
-            raise e
+
+        except ConversionCancelled as e:
+            processing_stats[f'conversionCancelled:{e.reason}'] += 1
+            return jsonify({'error': f'Error parsing document: {str(e)}', 'failureCode': e.reason}), 422
+
+        finally:
+            # Clean up any spill file
+            source.cleanup()
             
     except Exception as e:
         return jsonify({'error': f'Error parsing document: {str(e)}'}), 500
 
+def read_upload(file, spill_dir):
+    """Read an uploaded file into a DocumentSource, hashing it on the way in"""
+    return DocumentSource.from_stream(
+        file.filename, file.stream, app.config['DOCUMENT_SPILL_THRESHOLD'], spill_dir=spill_dir
+    )
+
+def collect_zip_members(zip_file, spill_dir):
+    """Read the supported members of an uploaded ZIP as document sources, enforcing archive limits"""
+    sources = []
+    try:
+        # Members are decompressed straight from the upload stream, without saving the archive
+        for source in iter_zip_documents(
+            zip_file.stream,
+            is_valid_file_format,
+            max_members=app.config['ZIP_MAX_MEMBERS'],
+            max_total_bytes=app.config['ZIP_MAX_TOTAL_BYTES'],
+            spill_threshold=app.config['DOCUMENT_SPILL_THRESHOLD'],
+            spill_dir=spill_dir
+        ):
+            sources.append(source)
+    except Exception:
+        # All or nothing: drop members already read from an archive that broke a limit
+        for source in sources:
+            source.cleanup()
+        raise
+    return sources
+
+def rejected_archive(filename, reason):
+    """A file entry standing for a whole ZIP that was rejected; its verdict is already set,
+    so it becomes a failed record like any file rejected by triage"""
+    return {
+        'name': filename,
+        'source': DocumentSource(filename, data=b''),
+        'triage': {
+            'verdict': TRIAGE_REJECT,
+            'mimeType': 'application/zip',
+            'format': None,
+            'pageCount': None,
+            'hasTextLayer': None,
+            'reasons': [reason]
+        }
+    }
+
+def collect_upload_files(files, dest_dir):
+    """Collect uploaded resumes (and supported members of uploaded ZIPs) as document sources.
+    
+    Returns dicts with the file 'name' and its 'source'; anything written to disk goes in dest_dir.
+    """
+    files_to_process = []
+    
+    for file in files:
+        if file.filename == '':
+            continue
+            
+        if file.filename.lower().endswith('.zip'):
+            # Handle zip file
+            try:
+                for source in collect_zip_members(file, dest_dir):
+                    files_to_process.append({
+                        'name': source.name,
+                        'source': source
+                    })
+            except ZipLimitExceeded as e:
+                print(f"Rejected zip file {file.filename}: {e}")
+                files_to_process.append(rejected_archive(file.filename, str(e)))
+            except Exception as e:
+                print(f"Error processing zip file {file.filename}: {e}")
+                files_to_process.append(rejected_archive(file.filename, f'Unreadable ZIP archive: {e}'))
+                
+        elif is_valid_file_format(file.filename):
+            # Handle individual file: kept in memory unless it's large enough to spill
+            files_to_process.append({
+                'name': file.filename,
+                'source': read_upload(file, dest_dir)
+            })
+    
+    return files_to_process
+
+def remove_files(files_to_process):
+    """Delete any temporary copies of processed uploads"""
+    for file_info in files_to_process:
+        file_info['source'].cleanup()
+
+def check_batch_size(files_to_process):
+    """Return an error response if the batch is empty or too large, otherwise None"""
+    if len(files_to_process) > 100:
+        return jsonify({
+            'error': 'Too many files. Maximum 100 resumes per upload.',
+            'fileCount': len(files_to_process)
+        }), 400
+    
+    if len(files_to_process) == 0:
+        return jsonify({
+            'error': 'No valid resume files found. Supported formats: .pdf, .doc, .docx'
+        }), 400
+    
+    return None
+
+def build_batch_response(total_uploaded, parsed_candidates):
+    """Deduplicate parsed candidates and build the batch upload response"""
+    # Remove duplicates based on email
+    unique_candidates = remove_duplicates_by_email(parsed_candidates)
+    
+    successfully_parsed = [c for c in unique_candidates if c.get('parseStatus') == 'success']
+    failed_to_parse = [c for c in unique_candidates if c.get('parseStatus') == 'failed']
+    # Near duplicates are only reported, since the copies may differ in ways a reviewer cares about
+    clusters = near_duplicate_clusters(parsed_candidates)
+    
+    return {
+        'totalUploaded': total_uploaded,
+        'totalProcessed': len(unique_candidates),
+        'successfullyParsed': len(successfully_parsed),
+        'failedToParse': len(failed_to_parse),
+        'candidates': unique_candidates,
+        'nearDuplicateClusters': clusters,
+        'summary': {
+            'totalResumesUploaded': total_uploaded,
+            'successfullyParsed': len(successfully_parsed),
+            'failedToParse': len(failed_to_parse),
+            'duplicatesRemoved': len(parsed_candidates) - len(unique_candidates),
+            'nearDuplicateClusters': len(clusters)
+        }
+    }
+
 @app.route('/upload-resumes', methods=['POST'])
 def upload_resumes():
     """Upload and parse multiple resume files"""
@@ -1116,197 +1858,482 @@ def upload_resumes():
         if not files:
             return jsonify({'error': 'No files selected'}), 400
         
-        files_to_process = []
+        files_to_process = collect_upload_files(files, app.config['UPLOAD_FOLDER'])
         
-        # Process each uploaded file
-        for file in files:
-            if file.filename == '':
-                continue
-                
-            if file.filename.lower().endswith('.zip'):
-                # Handle zip file
+        error_response = check_batch_size(files_to_process)
+        if error_response:
+            remove_files(files_to_process)
+            return error_response
+        
+        # Parse resumes (in parallel when a parser pool is configured)
+        try:
+            parsed_candidates = parse_files(files_to_process)
+        finally:
+            remove_files(files_to_process)
+        
+        batch_id = str(uuid.uuid4())
+        store_candidates(parsed_candidates, batch_id)
+        
+        response = build_batch_response(len(files_to_process), parsed_candidates)
+        response['batchId'] = batch_id
+        fields = requested_fields()
+        response['candidates'] = [project_candidate(c, fields) for c in response['candidates']]
+        return jsonify(response)
+        
+    except Exception as e:
+        return jsonify({'error': f'Internal server error during resume processing: {str(e)}'}), 500
+
+def format_stream_event(event, payload, stream_format):
+    """Serialize one streaming event as an NDJSON line or a Server-Sent Event"""
+    data = json.dumps(dict(payload, event=event))
+    if stream_format == 'sse':
+        return f'event: {event}\ndata: {data}\n\n'
+    return data + '\n'
+
+@app.route('/upload-resumes/stream', methods=['POST'])
+def upload_resumes_stream():
+    """Upload resumes and stream each candidate record as soon as its file is parsed.
+    
+    The response is NDJSON by default, or Server-Sent Events with ?format=sse or an
+    Accept: text/event-stream header. Deduplication results and the summary follow in
+    a final 'complete' event.
+    """
+    try:
+        if 'files' not in request.files:
+            return jsonify({'error': 'No files uploaded'}), 400
+        
+        files = request.files.getlist('files')
+        if not files:
+            return jsonify({'error': 'No files selected'}), 400
+        
+        stream_format = request.args.get('format')
+        if not stream_format:
+            stream_format = 'sse' if 'text/event-stream' in request.headers.get('Accept', '') else 'ndjson'
+        if stream_format not in ('ndjson', 'sse'):
+            return jsonify({'error': 'Unsupported stream format. Use ndjson or sse.'}), 400
+        fields = requested_fields()
+        
+        files_to_process = collect_upload_files(files, app.config['UPLOAD_FOLDER'])
+        
+        error_response = check_batch_size(files_to_process)
+        if error_response:
+            remove_files(files_to_process)
+            return error_response
+    
+    except Exception as e:
+        return jsonify({'error': f'Internal server error during resume processing: {str(e)}'}), 500
+    
+    def generate():
+        parsed_candidates = [None] * len(files_to_process)
+        batch_id = str(uuid.uuid4())
+        stored = False
+        try:
+            yield format_stream_event('start', {'totalUploaded': len(files_to_process), 'batchId': batch_id}, stream_format)
+            
+            for index, candidate in iter_parsed_files(files_to_process, batch_size=1):
+                parsed_candidates[index] = candidate
+                # Stored before it is sent, so its id can be looked up or corrected right away
                 try:
-                    zip_path = os.path.join(app.config['UPLOAD_FOLDER'], file.filename)
-                    file.save(zip_path)
-                    
-                    with zipfile.ZipFile(zip_path, 'r') as zip_file:
-                        for zip_info in zip_file.filelist:
-                            if not zip_info.is_dir() and is_valid_file_format(zip_info.filename):
-                                # Extract file to temp location
-                                extracted_path = zip_file.extract(zip_info, app.config['UPLOAD_FOLDER'])
-                                files_to_process.append({
-                                    'path': extracted_path,
-                                    'name': os.path.basename(zip_info.filename)
-                                })
-                    
-                    # Clean up zip file
-                    os.remove(zip_path)
-                    
+                    candidate_store.upsert_many([candidate], batch_id)
                 except Exception as e:
-                    print(f"Error processing zip file {file.filename}: {e}")
-                    
-            elif is_valid_file_format(file.filename):
-                # Handle individual file
-                temp_path = os.path.join(app.config['UPLOAD_FOLDER'], file.filename)
-                file.save(temp_path)
-                files_to_process.append({
-                    'path': temp_path,
-                    'name': file.filename
-                })
-        
-        # Check file limit
-        if len(files_to_process) > 100:
-            # Clean up files
-            for file_info in files_to_process:
-                if os.path.exists(file_info['path']):
-                    os.remove(file_info['path'])
+                    print(f"Error storing candidate of batch {batch_id}: {e}")
+                yield format_stream_event(
+                    'candidate', {'index': index, 'candidate': project_candidate(candidate, fields)}, stream_format
+                )
             
-            return jsonify({
-                'error': 'Too many files. Maximum 100 resumes per upload.',
-                'fileCount': len(files_to_process)
-            }), 400
+            stored = True
+            store_candidates(parsed_candidates, batch_id)
+            
+            # Candidates were already sent; the final event only says which ones were duplicates
+            response = build_batch_response(len(files_to_process), parsed_candidates)
+            response['batchId'] = batch_id
+            kept_ids = {c['id'] for c in response.pop('candidates')}
+            response['duplicateIds'] = [c['id'] for c in parsed_candidates if c['id'] not in kept_ids]
+            yield format_stream_event('complete', response, stream_format)
         
-        if len(files_to_process) == 0:
-            return jsonify({
-                'error': 'No valid resume files found. Supported formats: .pdf, .doc, .docx'
-            }), 400
+        except Exception as e:
+            yield format_stream_event('error', {'error': f'Internal server error during resume processing: {str(e)}'}, stream_format)
         
-        # Process resumes sequentially
-        parsed_candidates = []
+        finally:
+            if not stored:
+                # The client went away or parsing failed: resolve and index whatever was already sent
+                store_candidates([c for c in parsed_candidates if c is not None], batch_id)
+            remove_files(files_to_process)
+    
+    mimetype = 'text/event-stream' if stream_format == 'sse' else 'application/x-ndjson'
+    return Response(
+        stream_with_context(generate()),
+        mimetype=mimetype,
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route('/jobs', methods=['POST'])
+def submit_job():
+    """Queue resume files for background parsing and return a job ID immediately"""
+    try:
+        if 'files' not in request.files:
+            return jsonify({'error': 'No files uploaded'}), 400
         
-        for i, file_info in enumerate(files_to_process):
-            try:
-                candidate_data = parser.extract_candidate_info(file_info['path'], file_info['name'])
-                parsed_candidates.append(candidate_data)
-                
-                # Clean up file
-                if os.path.exists(file_info['path']):
-                    os.remove(file_info['path'])
-                
-                # Small delay for stability
-                if i < len(files_to_process) - 1:
-                    import time
-                    time.sleep(0.1)
-                    
-            except Exception as e:
-                print(f"Error processing {file_info['name']}: {e}")
-                parsed_candidates.append({
-                    'fileName': file_info['name'],
-                    'parseStatus': 'failed',
-                    'failureReason': f'Processing error: {str(e)}',
-                    'uploadTimestamp': datetime.now().isoformat(),
-                    'id': str(uuid.uuid4())
-                })
-                
-                # Clean up file
-                if os.path.exists(file_info['path']):
-                    os.remove(file_info['path'])
+        files = request.files.getlist('files')
+        if not files:
+            return jsonify({'error': 'No files selected'}), 400
         
-        # Remove duplicates based on email
-        unique_candidates = remove_duplicates_by_email(parsed_candidates)
+        # Job files must outlive the request, so each job gets its own directory
+        job_id = str(uuid.uuid4())
+        job_dir = os.path.join(app.config['UPLOAD_FOLDER'], 'jobs', job_id)
+        os.makedirs(job_dir)
         
-        successfully_parsed = [c for c in unique_candidates if c.get('parseStatus') == 'success']
-        failed_to_parse = [c for c in unique_candidates if c.get('parseStatus') == 'failed']
+        files_to_process = collect_upload_files(files, job_dir)
         
-        response = {
-            'totalUploaded': len(files_to_process),
-            'totalProcessed': len(unique_candidates),
-            'successfullyParsed': len(successfully_parsed),
-            'failedToParse': len(failed_to_parse),
-            'candidates': unique_candidates,
-            'summary': {
-                'totalResumesUploaded': len(files_to_process),
-                'successfullyParsed': len(successfully_parsed),
-                'failedToParse': len(failed_to_parse),
-                'duplicatesRemoved': len(parsed_candidates) - len(unique_candidates)
-            }
-        }
+        error_response = check_batch_size(files_to_process)
+        if error_response:
+            shutil.rmtree(job_dir, ignore_errors=True)
+            return error_response
         
-        return jsonify(response)
+        # Persist every file in the job directory so queued work survives a restart
+        job_files = []
+        for seq, file_info in enumerate(files_to_process):
+            # Triage while the upload is still in memory; the verdict decides the job's queue order
+            triage = triage_file(file_info)
+            extension = os.path.splitext(file_info['name'])[1].lower()
+            saved = file_info['source'].save_to(os.path.join(job_dir, f'{seq:04d}{extension}'))
+            job_files.append({'name': file_info['name'], 'path': saved.path, 'triage': triage})
+        
+        submit_batch_job(job_id, job_files)
+        
+        return jsonify({
+            'jobId': job_id,
+            'status': 'queued',
+            'totalFiles': len(files_to_process)
+        }), 202
         
     except Exception as e:
-        return jsonify({'error': f'Internal server error during resume processing: {str(e)}'}), 500
+        return jsonify({'error': f'Error submitting job: {str(e)}'}), 500
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job_status(job_id):
+    """Report progress of a batch job"""
+    job = job_store.get_job(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job)
+
+@app.route('/jobs/<job_id>/results', methods=['GET'])
+def get_job_results(job_id):
+    """Fetch the parsed candidates of a batch job (partial while the job is still running)"""
+    job = job_store.get_job(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    response = build_batch_response(job['totalFiles'], job_store.get_results(job_id))
+    fields = requested_fields()
+    response['candidates'] = [project_candidate(c, fields) for c in response['candidates']]
+    response['jobId'] = job_id
+    response['status'] = job['status']
+    return jsonify(response)
+
+# Default CSV report columns: candidate record field and header
+CSV_COLUMNS = [
+    ('fileName', 'File Name'),
+    ('fullName', 'Full Name'),
+    ('email', 'Email'),
+    ('contactNumber', 'Contact Number'),
+    ('allNames', 'All Names'),
+    ('allEmails', 'All Emails'),
+    ('allPhones', 'All Phones'),
+    ('parseStatus', 'Parse Status'),
+    ('failureReason', 'Failure Reason'),
+    ('uploadTimestamp', 'Upload Timestamp')
+]
+CSV_HEADERS = dict(CSV_COLUMNS)
+# Record fields stored exports can be filtered on with ?field=value[,value...]
+CSV_EXPORT_FILTERS = ('parseStatus', 'lane', 'conversionEngine', 'failureCode', 'nameTier')
+# Rows are sent in chunks of about this many bytes
+CSV_CHUNK_BYTES = 64 * 1024
+
+def csv_cell(value):
+    """Render one record field as a CSV cell: lists comma-joined, nested data as JSON"""
+    if value is None:
+        return ''
+    if isinstance(value, list):
+        return ', '.join(str(item) for item in value)
+    if isinstance(value, dict):
+        return json.dumps(value)
+    return value
+
+def iter_csv_chunks(candidates, fields, compress=False):
+    """Encode candidate records as CSV a chunk at a time, gzip-compressed if requested.
+    
+    Only one chunk of rows is held at once, so memory use doesn't grow with the export.
+    """
+    compressor = zlib.compressobj(wbits=31) if compress else None
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    
+    def take_chunk():
+        data = buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+        return compressor.compress(data) if compressor else data
+    
+    writer.writerow([CSV_HEADERS.get(field, field) for field in fields])
+    for candidate in candidates:
+        writer.writerow([csv_cell(candidate.get(field)) for field in fields])
+        if buffer.tell() >= CSV_CHUNK_BYTES:
+            chunk = take_chunk()
+            if chunk:
+                yield chunk
+    
+    chunk = take_chunk()
+    if compressor:
+        chunk += compressor.flush()
+    if chunk:
+        yield chunk
+
+def csv_response(chunks, compress=False):
+    """Stream CSV chunks as a report download"""
+    download_name = 'resume_parsing_report.csv' + ('.gz' if compress else '')
+    return Response(
+        chunks,
+        mimetype='application/gzip' if compress else 'text/csv',
+        headers={'Content-Disposition': f'attachment; filename={download_name}'}
+    )
 
 @app.route('/export-csv', methods=['POST'])
 def export_csv():
-    """Export candidates data to CSV"""
+    """Export candidates data to CSV.
+    
+    The body names stored candidates by 'ids', or carries the 'candidates' records themselves.
+    """
     try:
         data = request.get_json()
-        candidates = data.get('candidates', [])
+        candidate_ids = data.get('ids')
+        if candidate_ids is not None:
+            if not isinstance(candidate_ids, list):
+                return jsonify({'error': 'Invalid candidate ids'}), 400
+            candidates = candidate_store.get_many(candidate_ids, with_text=False)
+        else:
+            candidates = data.get('candidates', [])
         
         if not candidates or not isinstance(candidates, list):
             return jsonify({'error': 'Invalid candidates data'}), 400
         
-        # Create CSV content
-        output = io.StringIO()
-        writer = csv.writer(output)
-        
-        # Write headers
-        headers = ['File Name', 'Full Name', 'Email', 'Contact Number', 'All Names', 'All Emails', 'All Phones', 'Parse Status', 'Failure Reason', 'Upload Timestamp']
-        writer.writerow(headers)
-        
-        # Write data
-        for candidate in candidates:
-            row = [
-                candidate.get('fileName', ''),
-                candidate.get('fullName', ''),
-                candidate.get('email', ''),
-                candidate.get('contactNumber', ''),
-                ', '.join(candidate.get('allNames', [])),
-                ', '.join(candidate.get('allEmails', [])),
-                ', '.join(candidate.get('allPhones', [])),
-                candidate.get('parseStatus', ''),
-                candidate.get('failureReason', ''),
-                candidate.get('uploadTimestamp', '')
-            ]
-            writer.writerow(row)
-        
-        # Create response
-        output.seek(0)
-        csv_data = output.getvalue()
-        output.close()
-        
-        # Create a BytesIO object for file response
-        csv_file = io.BytesIO()
-        csv_file.write(csv_data.encode('utf-8'))
-        csv_file.seek(0)
-        
-        return send_file(
-            csv_file,
-            mimetype='text/csv',
-            as_attachment=True,
-            download_name='resume_parsing_report.csv'
-        )
+        return csv_response(iter_csv_chunks(candidates, [field for field, _header in CSV_COLUMNS]))
         
     except Exception as e:
         return jsonify({'error': f'Error generating CSV report: {str(e)}'}), 500
 
+@app.route('/export-csv', methods=['GET'])
+def export_stored_csv():
+    """Stream the stored candidates of a batch or job as CSV, straight from the candidate store.
+    
+    ?batchId= or ?jobId= picks the records; ?columns= lists record fields to export (the
+    report columns by default); ?gzip=true compresses the download; CSV_EXPORT_FILTERS
+    fields filter rows, e.g. ?parseStatus=success.
+    """
+    batch_id = request.args.get('batchId') or request.args.get('jobId')
+    if not batch_id:
+        return jsonify({'error': 'Specify a batchId or jobId to export'}), 400
+    if not candidate_store.has_batch(batch_id) and job_store.get_job(batch_id) is None:
+        return jsonify({'error': 'Batch not found'}), 404
+    
+    columns = request.args.get('columns')
+    fields = [field.strip() for field in columns.split(',') if field.strip()] if columns else \
+        [field for field, _header in CSV_COLUMNS]
+    if not fields:
+        return jsonify({'error': 'No columns selected'}), 400
+    
+    filters = {field: set(request.args[field].split(',')) for field in CSV_EXPORT_FILTERS if field in request.args}
+    compress = request.args.get('gzip', '').lower() in ('1', 'true', 'yes')
+    with_text = 'rawText' in fields
+    
+    def matching_candidates():
+        for candidate in candidate_store.iter_batch(batch_id, with_text=with_text):
+            if all(str(candidate.get(field)) in values for field, values in filters.items()):
+                yield candidate
+    
+    return csv_response(iter_csv_chunks(matching_candidates(), fields, compress), compress)
+
 @app.route('/update-candidate/<candidate_id>', methods=['PUT'])
 def update_candidate(candidate_id):
     """Update candidate information"""
     try:
         data = request.get_json()
-        full_name = data.get('fullName')
-        email = data.get('email')
-        contact_number = data.get('contactNumber')
+        if not isinstance(data, dict):
+            return jsonify({'error': 'Invalid candidate data'}), 400
+        
+        candidate = candidate_store.update(candidate_id, data)
+        if candidate is None:
+            return jsonify({'error': 'Candidate not found'}), 404
+        
+        # A corrected email or phone can tie the record to another person
+        try:
+            identity = identity_index.resolve([candidate])[candidate_id]
+            candidate = candidate_store.update(candidate_id, identity, editable=IDENTITY_FIELDS)
+        except Exception as e:
+            print(f"Error resolving identity of candidate {candidate_id}: {e}")
         
-        # In a real application, you would update the database
-        # For this POC, we'll just return the updated data
         return jsonify({
             'id': candidate_id,
-            'fullName': full_name,
-            'email': email,
-            'contactNumber': contact_number,
+            'fullName': candidate.get('fullName'),
+            'email': candidate.get('email'),
+            'contactNumber': candidate.get('contactNumber'),
+            'personId': candidate.get('personId'),
+            'mergedWith': candidate.get('mergedWith'),
             'status': 'updated'
         })
         
     except Exception as e:
         return jsonify({'error': f'Error updating candidate: {str(e)}'}), 500
 
+@app.route('/candidates/<candidate_id>', methods=['GET'])
+def get_candidate(candidate_id):
+    """Fetch a stored candidate record by id, projected with ?fields="""
+    candidate = candidate_store.get(candidate_id)
+    if candidate is None:
+        return jsonify({'error': 'Candidate not found'}), 404
+    return jsonify(project_candidate(candidate, requested_fields()))
+
+@app.route('/candidates/<candidate_id>/text', methods=['GET'])
+def get_candidate_text(candidate_id):
+    """Fetch the extracted text of a stored candidate, which other responses leave out by default"""
+    text = candidate_store.get_text(candidate_id)
+    if text is None:
+        return jsonify({'error': 'Candidate not found'}), 404
+    return jsonify({'id': candidate_id, 'rawText': text})
+
+@app.route('/candidates', methods=['GET'])
+def find_candidates():
+    """Look up stored candidates by ?email= and/or ?phone=, compared after normalization"""
+    email = request.args.get('email')
+    phone = request.args.get('phone')
+    if not email and not phone:
+        return jsonify({'error': 'Specify an email or phone to look up'}), 400
+    
+    fields = requested_fields()
+    candidates = [project_candidate(c, fields) for c in candidate_store.find(email=email, phone=phone)]
+    return jsonify({'candidates': candidates, 'count': len(candidates)})
+
+@app.route('/persons/<person_id>', methods=['GET'])
+def get_person(person_id):
+    """Fetch every stored record resolved to a person; personIds of merged records resolve too"""
+    person = identity_index.person(person_id)
+    if person is None:
+        return jsonify({'error': 'Person not found'}), 404
+    fields = requested_fields()
+    person['candidates'] = [project_candidate(c, fields)
+                            for c in candidate_store.get_many(person['candidateIds'], with_text=wants_text(fields))]
+    return jsonify(person)
+
+@app.route('/search', methods=['GET'])
+def search_candidates():
+    """Full-text search over stored candidates, ranked by BM25.
+    
+    ?q= takes terms (AND-ed by default), "quoted phrases" and OR; results are paged
+    with ?page= (from 1) and ?pageSize= (at most 100).
+    """
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'error': 'Specify a search query with ?q='}), 400
+    try:
+        page = max(int(request.args.get('page', '1')), 1)
+        page_size = min(max(int(request.args.get('pageSize', '20')), 1), 100)
+    except ValueError:
+        return jsonify({'error': 'page and pageSize must be integers'}), 400
+    
+    fields = requested_fields()
+    total, hits = search_index.search(query, offset=(page - 1) * page_size, limit=page_size)
+    records = {c['id']: c for c in candidate_store.get_many([cid for cid, _score in hits], with_text=wants_text(fields))}
+    results = []
+    for candidate_id, score in hits:
+        if candidate_id in records:
+            results.append(dict(project_candidate(records[candidate_id], fields), score=round(score, 4)))
+    
+    return jsonify({
+        'query': query,
+        'total': total,
+        'page': page,
+        'pageSize': page_size,
+        'totalPages': -(-total // page_size),
+        'results': results
+    })
+
+@app.route('/stats', methods=['GET'])
+def get_stats():
+    """Report triage verdicts, lanes, conversion engines and pages, cache hit/miss counters and name extraction tier hit rates"""
+    hits = processing_stats['conversionCacheMemoryHits'] + processing_stats['conversionCacheDiskHits']
+    lookups = hits + processing_stats['conversionCacheMisses']
+    
+    tier_counts = {key.split(':', 1)[1]: count for key, count in processing_stats.items()
+                   if key.startswith('nameTier:')}
+    documents = sum(tier_counts.values())
+    triage_counts = {key.split(':', 1)[1]: count for key, count in processing_stats.items()
+                     if key.startswith('triage:')}
+    engine_counts = {key.split(':', 1)[1]: count for key, count in processing_stats.items()
+                     if key.startswith('conversionEngine:')}
+    cancelled_counts = {key.split(':', 1)[1]: count for key, count in processing_stats.items()
+                        if key.startswith('conversionCancelled:')}
+    lane_counts = {key.split(':', 1)[1]: count for key, count in processing_stats.items()
+                   if key.startswith('lane:')}
+    
+    return jsonify({
+        'triage': triage_counts,
+        'lanes': lane_counts,
+        'conversionEngines': {
+            'counts': engine_counts,
+            'doclingFallbacks': processing_stats['conversionFallbacks'],
+            'cancelled': cancelled_counts
+        },
+        'pages': {
+            'converted': processing_stats['pagesConverted'],
+            'total': processing_stats['totalPages'],
+            'skipped': processing_stats['totalPages'] - processing_stats['pagesConverted'],
+            'escalations': processing_stats['conversionEscalations']
+        },
+        'conversionCache': {
+            'memoryHits': processing_stats['conversionCacheMemoryHits'],
+            'diskHits': processing_stats['conversionCacheDiskHits'],
+            'misses': processing_stats['conversionCacheMisses'],
+            'hitRate': hits / lookups if lookups else None,
+            'serverProcess': conversion_cache.snapshot()
+        },
+        'searchIndex': {
+            'documents': len(search_index),
+            'segments': search_index.segment_count
+        },
+        'nameExtraction': {
+            'documents': documents,
+            'tierCounts': tier_counts,
+            'tierHitRates': {tier: count / documents for tier, count in tier_counts.items()}
+        }
+    })
+
+@app.route('/ready', methods=['GET'])
+def readiness_check():
+    """Readiness probe: 200 only once the document converter and NLP models are loaded"""
+    # A failed warm-up can leave the converter constructed but unusable
+    ready = parser.is_warm and warm_up_state['status'] != 'failed'
+    return jsonify({
+        'ready': ready,
+        'models': {
+            'documentConverter': parser.converter_loaded,
+            'nlp': parser.nlp.loaded
+        },
+        'warmUp': warm_up_state
+    }), (200 if ready else 503)
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
     return jsonify({'status': 'healthy', 'message': 'Python backend with docling is running'})
 
+@app.before_request
+def ensure_startup_tasks():
+    """Run the startup tasks in the process handling the request, if they haven't run yet"""
+    run_startup_tasks()
+
 if __name__ == '__main__':
+    # With the debug reloader, only the serving child process should load models and resume jobs
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        run_startup_tasks()
     app.run(debug=True, host='0.0.0.0', port=5001)
@@ -0,0 +1,92 @@
+"""Compare the OOXML and docling DOCX engines on a set of resumes.
+
+Usage: python benchmark_docx.py [--repeat N] FILE_OR_DIRECTORY...
+
+For each engine, reports the mean conversion time per file, how many formatting
+elements were found and how many of them carry a font size, and whether the
+candidate fields extracted from each engine's output agree.
+"""
+import argparse
+import os
+import statistics
+import time
+
+from app import ResumeParser
+from document_source import DocumentSource
+
+ENGINES = ('ooxml', 'docling')
+
+
+def collect_paths(arguments):
+    paths = []
+    for argument in arguments:
+        if os.path.isdir(argument):
+            paths.extend(sorted(os.path.join(argument, name) for name in os.listdir(argument)
+                                if name.lower().endswith('.docx')))
+        else:
+            paths.append(argument)
+    return paths
+
+
+def benchmark_engine(parser, paths, repeat):
+    """Convert every file repeat times, returning per-file timings and the last conversion"""
+    results = {}
+    for path in paths:
+        source = DocumentSource.from_path(path)
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            text, formatting, _converted, metadata = parser._convert_text_with_formatting(source)
+            timings.append(time.perf_counter() - started)
+        results[path] = {
+            'seconds': statistics.mean(timings),
+            'text': text,
+            'formatting': formatting,
+            'engine': metadata.get('conversionEngine')
+        }
+    return results
+
+
+def candidate_fields(parser, text, formatting):
+    name_result = parser.extract_names_cascade(text)
+    details = parser._build_candidate_details('', text, formatting, None, name_result)
+    return details['fullName'], details['email'], details['contactNumber']
+
+
+def main():
+    argument_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    argument_parser.add_argument('paths', nargs='+')
+    argument_parser.add_argument('--repeat', type=int, default=3)
+    arguments = argument_parser.parse_args()
+
+    paths = collect_paths(arguments.paths)
+    if not paths:
+        argument_parser.error('no .docx files found')
+
+    parsers = {engine: ResumeParser(docx_engine=engine) for engine in ENGINES}
+    # Convert one file untimed so one-off start-up (docling's pipeline) isn't counted
+    for parser in parsers.values():
+        parser._convert_text_with_formatting(DocumentSource.from_path(paths[0]))
+
+    runs = {engine: benchmark_engine(parsers[engine], paths, arguments.repeat) for engine in ENGINES}
+
+    print(f"{'file':40} {'engine':8} {'ms':>9} {'elements':>9} {'sized':>6}  fields")
+    for path in paths:
+        for engine in ENGINES:
+            run = runs[engine][path]
+            formatting = run['formatting']
+            sized = sum(1 for size in formatting.font_sizes if size is not None)
+            fields = candidate_fields(parsers[engine], run['text'], formatting)
+            print(f"{os.path.basename(path)[:40]:40} {run['engine'] or engine:8} {run['seconds'] * 1000:9.1f} "
+                  f"{len(formatting):9} {sized:6}  {fields}")
+
+    for engine in ENGINES:
+        total = sum(run['seconds'] for run in runs[engine].values())
+        print(f"{engine}: {total * 1000 / len(paths):.1f} ms per file on average")
+    speedup = sum(run['seconds'] for run in runs['docling'].values()) / sum(
+        run['seconds'] for run in runs['ooxml'].values())
+    print(f"ooxml is {speedup:.1f}x faster than docling")
+
+
+if __name__ == '__main__':
+    main()
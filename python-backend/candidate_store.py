@@ -0,0 +1,196 @@
+import json
+import os
+import sqlite3
+import threading
+import zlib
+from contextlib import contextmanager
+from datetime import datetime
+
+from contact_scanner import digits_only
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS candidates (
+    id TEXT PRIMARY KEY,
+    batch_id TEXT,
+    email_key TEXT,
+    phone_key TEXT,
+    record TEXT NOT NULL,
+    raw_text BLOB,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_candidates_email ON candidates(email_key);
+CREATE INDEX IF NOT EXISTS idx_candidates_phone ON candidates(phone_key);
+CREATE INDEX IF NOT EXISTS idx_candidates_batch ON candidates(batch_id);
+"""
+
+# Fields a reviewer may correct through update()
+EDITABLE_FIELDS = ('fullName', 'email', 'contactNumber')
+
+# SQLite limits the number of parameters in one statement
+LOOKUP_CHUNK_SIZE = 500
+
+
+def normalize_email(email):
+    """Lookup key for an email address: trimmed and lower-cased, or None"""
+    email = (email or '').strip().lower()
+    return email or None
+
+
+def normalize_phone(phone):
+    """Lookup key for a phone number: its digits, or None"""
+    digits = digits_only(phone or '')
+    return digits or None
+
+
+class CandidateStore:
+    """SQLite-backed store of parsed candidate records, indexed by id, email and phone.
+
+    Records are kept as JSON with rawText split out and zlib-compressed, so lookups and
+    updates by id don't need the client to send candidates back.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def upsert_many(self, candidates, batch_id=None):
+        """Insert or replace candidate records in a single transaction"""
+        now = datetime.now().isoformat()
+        rows = []
+        for candidate in candidates:
+            record = dict(candidate)
+            raw_text = record.pop('rawText', None)
+            if batch_id is not None:
+                record['batchId'] = batch_id
+            rows.append((
+                record['id'],
+                record.get('batchId'),
+                normalize_email(record.get('email')),
+                normalize_phone(record.get('contactNumber')),
+                json.dumps(record),
+                zlib.compress(raw_text.encode('utf-8')) if raw_text is not None else None,
+                now,
+                now
+            ))
+
+        with self._lock, self._connect() as conn:
+            # ON CONFLICT keeps the original created_at of a re-parsed record
+            conn.executemany(
+                'INSERT INTO candidates (id, batch_id, email_key, phone_key, record, raw_text, created_at, updated_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?) '
+                'ON CONFLICT(id) DO UPDATE SET batch_id = excluded.batch_id, email_key = excluded.email_key, '
+                'phone_key = excluded.phone_key, record = excluded.record, raw_text = excluded.raw_text, '
+                'updated_at = excluded.updated_at',
+                rows
+            )
+
+    def get(self, candidate_id):
+        """Return the full candidate record, rawText included, or None if unknown"""
+        with self._connect() as conn:
+            row = conn.execute('SELECT record, raw_text FROM candidates WHERE id = ?', (candidate_id,)).fetchone()
+        return self._record(row) if row is not None else None
+
+    def get_text(self, candidate_id):
+        """Return a candidate's rawText, '' if it has none, or None if the candidate is unknown"""
+        with self._connect() as conn:
+            row = conn.execute('SELECT raw_text FROM candidates WHERE id = ?', (candidate_id,)).fetchone()
+        if row is None:
+            return None
+        return zlib.decompress(row['raw_text']).decode('utf-8') if row['raw_text'] is not None else ''
+
+    def get_many(self, candidate_ids, with_text=True):
+        """Return the records of the known ids, in the order given; rawText is left out unless with_text"""
+        candidate_ids = list(candidate_ids)
+        text_column = 'raw_text' if with_text else 'NULL AS raw_text'
+        found = {}
+        with self._connect() as conn:
+            for start in range(0, len(candidate_ids), LOOKUP_CHUNK_SIZE):
+                chunk = candidate_ids[start:start + LOOKUP_CHUNK_SIZE]
+                rows = conn.execute(
+                    f"SELECT id, record, {text_column} FROM candidates WHERE id IN ({', '.join('?' * len(chunk))})",
+                    chunk
+                ).fetchall()
+                for row in rows:
+                    found[row['id']] = self._record(row)
+        return [found[candidate_id] for candidate_id in candidate_ids if candidate_id in found]
+
+    def iter_batch(self, batch_id, with_text=False):
+        """Yield a batch's records in the order they were stored, reading rows only as they are consumed"""
+        text_column = 'raw_text' if with_text else 'NULL AS raw_text'
+        with self._connect() as conn:
+            for row in conn.execute(
+                f'SELECT record, {text_column} FROM candidates WHERE batch_id = ? ORDER BY rowid', (batch_id,)
+            ):
+                yield self._record(row)
+
+    def has_batch(self, batch_id):
+        with self._connect() as conn:
+            return conn.execute('SELECT 1 FROM candidates WHERE batch_id = ? LIMIT 1', (batch_id,)).fetchone() is not None
+
+    def find(self, email=None, phone=None):
+        """Return records whose normalized email or phone matches, oldest first"""
+        conditions = []
+        params = []
+        email_key = normalize_email(email)
+        if email_key:
+            conditions.append('email_key = ?')
+            params.append(email_key)
+        phone_key = normalize_phone(phone)
+        if phone_key:
+            conditions.append('phone_key = ?')
+            params.append(phone_key)
+        if not conditions:
+            return []
+
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT record, raw_text FROM candidates WHERE {' OR '.join(conditions)} ORDER BY created_at",
+                params
+            ).fetchall()
+        return [self._record(row) for row in rows]
+
+    def update(self, candidate_id, fields, editable=EDITABLE_FIELDS):
+        """Apply reviewer corrections to a record and return it, or None if unknown.
+
+        Only the editable fields are changed; the email and phone keys follow the new values.
+        """
+        with self._lock, self._connect() as conn:
+            row = conn.execute('SELECT record FROM candidates WHERE id = ?', (candidate_id,)).fetchone()
+            if row is None:
+                return None
+            record = json.loads(row['record'])
+            for field in editable:
+                if field in fields:
+                    record[field] = fields[field]
+            now = datetime.now().isoformat()
+            record['updatedAt'] = now
+            conn.execute(
+                'UPDATE candidates SET record = ?, email_key = ?, phone_key = ?, updated_at = ? WHERE id = ?',
+                (json.dumps(record), normalize_email(record.get('email')),
+                 normalize_phone(record.get('contactNumber')), now, candidate_id)
+            )
+        return record
+
+    @staticmethod
+    def _record(row):
+        record = json.loads(row['record'])
+        if row['raw_text'] is not None:
+            record['rawText'] = zlib.decompress(row['raw_text']).decode('utf-8')
+        return record
@@ -0,0 +1,134 @@
+import re
+from collections import namedtuple
+from functools import lru_cache
+
+# kind is 'email', 'obfuscated_email' or 'phone'. normalized is the cleaned address for emails
+# and the digit string (keeping a leading '+') for phones. strict marks phones in one of the
+# well-formed layouts that regular extraction accepts; the aggressive pass takes every phone.
+ContactToken = namedtuple('ContactToken', ['kind', 'value', 'start', 'end', 'normalized', 'strict'])
+
+# Phone layouts, most specific first; shared by the contact scan and the labelled-span rescan
+PHONE_LAYOUTS = r'''
+    (?<!\d)(?P<phone>
+        \+\d{1,3}[-.\s]?\d{10}(?!\d)                              # +CC followed by 10 digits
+      | \+?\d{1,3}[-.\s]?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}       # country code with groups
+      | \(\d{3}\)\s*\d{3}[-.\s]?\d{4}                             # (xxx) xxx-xxxx
+      | \d{3}[-.\s]\d{3}[-.\s]\d{4}                               # xxx-xxx-xxxx or xxx.xxx.xxxx
+      | \d{10}                                                    # exactly 10 digits
+    )(?!\d)
+'''
+
+# A single alternation that finds every kind of contact in one pass over the text.
+# Alternatives are tried left to right at each position, so specific forms come first.
+CONTACT_PATTERN = re.compile(r'''
+    (?P<email>\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b)
+  | (?P<obfuscated>[A-Za-z0-9._%+-]+\s*(?:@|\[\s*(?i:at)\s*\]|\(\s*(?i:at)\s*\))\s*[A-Za-z0-9.-]+\.[A-Za-z]{2,})
+  | \b(?i:phone|mobile|tel)[:\s]*(?P<labelled>[+\d(][-+\d.\ \t()]*\d)
+  | ''' + PHONE_LAYOUTS, re.VERBOSE)
+
+PHONE_PATTERN = re.compile(PHONE_LAYOUTS, re.VERBOSE)
+
+# Layouts accepted by regular (non-aggressive) phone extraction; only ever matched against a token
+STRICT_PHONE_PATTERN = re.compile(r'''
+    \+\d{1,3}[-.\s]?\d{10}
+  | \+\d{1,3}[-.\s]?\d{3}[-.\s]?\d{3}[-.\s]?\d{4}
+  | \d{10}
+  | \(\d{3}\)\s*\d{3}[-.\s]?\d{4}
+  | \d{3}[-.\s]\d{3}[-.\s]\d{4}
+''', re.VERBOSE)
+
+# The national number of an international phone, reported alongside it as extraction always has
+NATIONAL_PART_PATTERN = re.compile(r'\+\d{1,3}[-.\s]?(?P<national>\d{10}|\d{3}[-.\s]\d{3}[-.\s]\d{4})')
+
+# Most digits an unrecognised labelled number may have (the E.164 maximum)
+MAX_PHONE_DIGITS = 15
+
+OBFUSCATED_AT_PATTERN = re.compile(r'\s*(?:\[\s*at\s*\]|\(\s*at\s*\))\s*', re.IGNORECASE)
+
+
+def digits_only(value):
+    """Return just the digits of a string"""
+    return ''.join(filter(str.isdigit, value))
+
+
+def to_e164(phone, default_country_code=None):
+    """Normalize a phone number to E.164 (+ and 8-15 digits), or return None.
+
+    Numbers without an international prefix are read as national numbers: leading
+    trunk zeros are dropped and default_country_code is prepended to a 10-digit rest.
+    """
+    phone = (phone or '').strip()
+    digits = digits_only(phone)
+    if phone.startswith('+'):
+        international = digits
+    elif digits.startswith('00'):
+        international = digits[2:]
+    else:
+        national = digits.lstrip('0')
+        if default_country_code and len(national) == 10:
+            international = default_country_code + national
+        elif default_country_code and national.startswith(default_country_code) and \
+                len(national) == len(default_country_code) + 10:
+            international = national
+        else:
+            return None
+    if not 8 <= len(international) <= 15 or international.startswith('0'):
+        return None
+    return '+' + international
+
+
+def _phone_token(value, start, end):
+    value = value.strip()
+    normalized = digits_only(value)
+    if value.startswith('+'):
+        normalized = '+' + normalized
+    return ContactToken('phone', value, start, end, normalized, STRICT_PHONE_PATTERN.fullmatch(value) is not None)
+
+
+def _phone_tokens(value, start):
+    """The phone token for a matched number, followed by its national part if it has one"""
+    token = _phone_token(value, start, start + len(value))
+    yield token
+    national = NATIONAL_PART_PATTERN.fullmatch(token.value) if token.strict else None
+    if national:
+        yield _phone_token(national.group('national'), start + national.start('national'),
+                           start + national.end('national'))
+
+
+def _labelled_phone_tokens(value, start):
+    """Phones within the run of phone characters after a label.
+
+    The run can swallow trailing numbers ("Phone: 9876543210 2019 2023"), so it is
+    rescanned for regular layouts; only when none is found is the whole run taken,
+    and then only if it is short enough to be one number.
+    """
+    tokens = [token for match in PHONE_PATTERN.finditer(value)
+              for token in _phone_tokens(match.group('phone'), start + match.start('phone'))]
+    if tokens:
+        return tokens
+    if len(digits_only(value)) <= MAX_PHONE_DIGITS:
+        return [_phone_token(value, start, start + len(value))]
+    return []
+
+
+@lru_cache(maxsize=32)
+def scan_contacts(text):
+    """Scan text once and return its email and phone tokens in document order.
+
+    Results are cached per text so the regular and aggressive extractors share one scan.
+    """
+    tokens = []
+    for match in CONTACT_PATTERN.finditer(text):
+        kind = match.lastgroup
+        if kind == 'email':
+            value = match.group('email')
+            tokens.append(ContactToken('email', value, match.start(), match.end(), value, True))
+        elif kind == 'obfuscated':
+            value = match.group('obfuscated')
+            normalized = ''.join(OBFUSCATED_AT_PATTERN.sub('@', value).split())
+            tokens.append(ContactToken('obfuscated_email', value, match.start(), match.end(), normalized, False))
+        elif kind == 'labelled':
+            tokens.extend(_labelled_phone_tokens(match.group('labelled'), match.start('labelled')))
+        else:
+            tokens.extend(_phone_tokens(match.group('phone'), match.start('phone')))
+    return tuple(tokens)
@@ -0,0 +1,170 @@
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+# Bump when the cached entry layout changes so stale disk entries are ignored
+CACHE_FORMAT_VERSION = 3
+
+# Eviction frees space down to this fraction of the size limit, so it doesn't run again on the next write
+DISK_EVICTION_TARGET = 0.9
+
+
+class ConversionCache:
+    """Two-tier (memory LRU + size-bounded disk) cache of document conversions keyed by content hash"""
+
+    def __init__(self, cache_dir=None, max_memory_entries=256, max_disk_bytes=512 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_bytes = max_disk_bytes
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        # Size of the disk tier, counted by one directory walk on the first write and then kept up to date;
+        # other processes sharing the directory are accounted for whenever eviction walks it again
+        self._disk_bytes = None
+        self._disk_lock = threading.Lock()
+        self.stats = {'memoryHits': 0, 'diskHits': 0, 'misses': 0, 'memoryEvictions': 0, 'diskEvictions': 0}
+
+        if self.cache_dir and self.max_disk_bytes > 0:
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    def get(self, key):
+        """Return the cached (text, formatting, metadata) for a key and which tier served it, or (None, None)"""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self.stats['memoryHits'] += 1
+                return entry, 'memory'
+
+        entry = self._read_disk(key)
+        if entry is not None:
+            with self._lock:
+                self.stats['diskHits'] += 1
+            self._remember(key, entry)
+            return entry, 'disk'
+
+        with self._lock:
+            self.stats['misses'] += 1
+        return None, None
+
+    def put(self, key, text, formatting, metadata=None):
+        """Store a conversion, with metadata about how it was produced, in both tiers"""
+        entry = (text, formatting, metadata or {})
+        self._remember(key, entry)
+        self._write_disk(key, entry)
+
+    def snapshot(self):
+        """Return a copy of the hit/miss counters and tier sizes"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats['memoryEntries'] = len(self._memory)
+        return stats
+
+    def _remember(self, key, entry):
+        if self.max_memory_entries <= 0:
+            return
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_memory_entries:
+                self._memory.popitem(last=False)
+                self.stats['memoryEvictions'] += 1
+
+    def _disk_path(self, key):
+        # Fan out into subdirectories so a large cache doesn't put everything in one directory
+        return os.path.join(self.cache_dir, key[:2], f'{key}.json')
+
+    def _read_disk(self, key):
+        if not self.cache_dir or self.max_disk_bytes <= 0:
+            return None
+
+        path = self._disk_path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != CACHE_FORMAT_VERSION:
+                return None
+            # Refresh the modification time so disk eviction is least-recently-used
+            os.utime(path)
+            return data['text'], data['formatting'], data['metadata']
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Failed to read conversion cache entry {key}: {e}")
+            return None
+
+    def _write_disk(self, key, entry):
+        if not self.cache_dir or self.max_disk_bytes <= 0:
+            return
+
+        text, formatting, metadata = entry
+        path = self._disk_path(key)
+        temp_path = None
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write to a temporary file and rename so concurrent readers never see partial entries
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'version': CACHE_FORMAT_VERSION, 'text': text, 'formatting': formatting, 'metadata': metadata}, f)
+                f.flush()
+                size = os.fstat(f.fileno()).st_size
+            with self._disk_lock:
+                if self._disk_bytes is None:
+                    self._disk_bytes = sum(entry_size for _mtime, entry_size, _path in self._disk_entries())
+                try:
+                    replaced_size = os.stat(path).st_size
+                except FileNotFoundError:
+                    replaced_size = 0
+                os.replace(temp_path, path)
+                temp_path = None
+                self._disk_bytes += size - replaced_size
+                if self._disk_bytes > self.max_disk_bytes:
+                    self._evict_disk()
+        except Exception as e:
+            print(f"Failed to write conversion cache entry {key}: {e}")
+        finally:
+            if temp_path is not None:
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
+
+    def _disk_entries(self):
+        """(mtime, size, path) of every entry in the disk tier"""
+        entries = []
+        for root, _dirs, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith('.json'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _evict_disk(self):
+        """Delete least recently used entries until the disk tier is back under its size limit.
+
+        Called with _disk_lock held once the running total passes the limit; the walk also
+        resynchronizes the total with what is actually on disk.
+        """
+        entries = self._disk_entries()
+        total_size = sum(size for _mtime, size, _path in entries)
+        target = self.max_disk_bytes * DISK_EVICTION_TARGET
+
+        entries.sort()
+        for _mtime, size, path in entries:
+            if total_size <= target:
+                break
+            try:
+                os.remove(path)
+                total_size -= size
+                with self._lock:
+                    self.stats['diskEvictions'] += 1
+            except FileNotFoundError:
+                continue
+        self._disk_bytes = total_size
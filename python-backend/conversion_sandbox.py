@@ -0,0 +1,242 @@
+import multiprocessing
+import os
+import queue
+import threading
+import time
+
+# How often the parent checks a running conversion's deadline and memory use
+POLL_INTERVAL_SECONDS = 0.2
+
+
+class ConversionCancelled(Exception):
+    """Raised when a sandboxed conversion was stopped; reason is 'timeout', 'memory' or 'crashed'"""
+
+    reason = 'crashed'
+
+
+class ConversionTimeout(ConversionCancelled):
+    reason = 'timeout'
+
+
+class ConversionMemoryExceeded(ConversionCancelled):
+    reason = 'memory'
+
+
+def _sandbox_main(connection, parser_factory, warm_up):
+    """Entry point of a sandbox process: convert documents sent over the connection until told to stop"""
+    parser = parser_factory()
+    warm_up_error = None
+    if warm_up:
+        try:
+            parser.warm_up_converter()
+        except Exception as e:
+            warm_up_error = str(e)
+    connection.send(('ready', warm_up_error))
+
+    while True:
+        try:
+            request = connection.recv()
+        except EOFError:
+            break
+        if request is None:
+            break
+
+        source, max_pages = request
+        try:
+            text, formatted_text, converted, metadata = parser._convert_text_with_formatting(source, max_pages)
+            connection.send(('ok', (text, formatted_text.to_dict(), converted, metadata)))
+        except BaseException as e:
+            # MemoryError included: report it and let the parent decide whether to recycle
+            connection.send(('error', str(e)))
+
+
+def _resident_bytes(pid):
+    """Resident set size of a process, or None where /proc isn't available"""
+    try:
+        with open(f'/proc/{pid}/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class ConversionSandbox:
+    """A document conversion process that can be killed.
+
+    Conversions run one at a time in a spawned process holding its own parser. The
+    parent enforces a wall-clock deadline and a resident memory ceiling on each
+    conversion and kills the process when either is exceeded, and it replaces the
+    process after max_documents conversions to contain leaks. Not thread-safe; use
+    one sandbox per thread (see SandboxPool).
+    """
+
+    def __init__(self, parser_factory, timeout=None, memory_limit_bytes=None, max_documents=None,
+                 warm_up=True):
+        self.parser_factory = parser_factory
+        self.timeout = timeout
+        self.memory_limit_bytes = memory_limit_bytes
+        self.max_documents = max_documents
+        self.warm_up_on_start = warm_up
+        self._process = None
+        self._connection = None
+        self._ready = False
+        self._warmed = False
+        self._documents = 0
+
+    @property
+    def is_warm(self):
+        """Whether the converter has been loaded; stays true while killed processes are replaced"""
+        return self._warmed
+
+    def start(self):
+        """Start the sandbox process if it isn't running; doesn't wait for it to warm up"""
+        if self._process is not None:
+            return
+        context = multiprocessing.get_context('spawn')
+        parent_connection, child_connection = context.Pipe()
+        self._process = context.Process(
+            target=_sandbox_main,
+            args=(child_connection, self.parser_factory, self.warm_up_on_start),
+            name='conversion-sandbox',
+            daemon=True
+        )
+        self._process.start()
+        child_connection.close()
+        self._connection = parent_connection
+        self._ready = False
+        self._documents = 0
+
+    def warm_up(self):
+        """Start the process and wait until its converter is loaded"""
+        self.start()
+        self._wait_ready()
+
+    def convert(self, source, max_pages=None):
+        """Convert a DocumentSource, returning (text, formatting dict, fully_converted, metadata).
+
+        Raises ConversionCancelled if the conversion was killed.
+        """
+        self.warm_up()
+        try:
+            self._connection.send((source, max_pages))
+        except OSError:
+            # The idle process died (OOM killer, crash) since its last conversion: replace it and retry once
+            self._kill()
+            self.warm_up()
+            self._connection.send((source, max_pages))
+        try:
+            status, payload = self._receive(self.timeout)
+        except ConversionCancelled:
+            # Start the replacement right away so it warms up while the caller carries on
+            self.start()
+            raise
+
+        self._documents += 1
+        if self.max_documents and self._documents >= self.max_documents:
+            # Recycle now, so the replacement warms up while the caller carries on
+            self.close()
+            self.start()
+
+        if status == 'error':
+            raise Exception(payload)
+        return payload
+
+    def close(self):
+        """Stop the process, killing it if it doesn't exit promptly"""
+        if self._process is None:
+            return
+        try:
+            self._connection.send(None)
+        except (OSError, ValueError):
+            pass
+        self._process.join(timeout=1)
+        self._kill()
+
+    def _wait_ready(self):
+        if self._ready:
+            return
+        # Loading models can take a while, so only memory and crashes are checked, not time
+        _status, warm_up_error = self._receive(None)
+        if warm_up_error:
+            print(f"Conversion sandbox warm-up failed: {warm_up_error}")
+        self._ready = True
+        self._warmed = True
+
+    def _receive(self, timeout):
+        """Wait for the next message from the process, enforcing the deadline and memory ceiling"""
+        deadline = time.monotonic() + timeout if timeout else None
+        while True:
+            if self._connection.poll(POLL_INTERVAL_SECONDS):
+                try:
+                    return self._connection.recv()
+                except EOFError:
+                    break
+
+            if not self._process.is_alive():
+                break
+            if deadline is not None and time.monotonic() > deadline:
+                self._kill()
+                raise ConversionTimeout(f'conversion took longer than {timeout:g} seconds and was cancelled')
+            if self.memory_limit_bytes:
+                resident = _resident_bytes(self._process.pid)
+                if resident is not None and resident > self.memory_limit_bytes:
+                    self._kill()
+                    raise ConversionMemoryExceeded(
+                        f'conversion used more than {self.memory_limit_bytes // (1024 * 1024)} MB and was cancelled'
+                    )
+
+        # The pipe closes a moment before the process can be reaped
+        self._process.join(timeout=1)
+        exitcode = self._process.exitcode
+        self._kill()
+        raise ConversionCancelled(f'conversion process exited unexpectedly (exit code {exitcode})')
+
+    def _kill(self):
+        if self._process is None:
+            return
+        if self._process.is_alive():
+            self._process.kill()
+        self._process.join()
+        self._connection.close()
+        self._process = None
+        self._connection = None
+        self._ready = False
+
+
+class SandboxPool:
+    """A fixed set of conversion sandboxes shared between threads"""
+
+    def __init__(self, size, parser_factory, **sandbox_options):
+        self.sandboxes = [ConversionSandbox(parser_factory, **sandbox_options) for _ in range(max(size, 1))]
+        self._idle = queue.LifoQueue()
+        for sandbox in self.sandboxes:
+            self._idle.put(sandbox)
+        self._warm_up_lock = threading.Lock()
+
+    @property
+    def is_warm(self):
+        return all(sandbox.is_warm for sandbox in self.sandboxes)
+
+    def convert(self, source, max_pages=None):
+        """Convert on the next free sandbox, waiting for one if all are busy"""
+        sandbox = self._idle.get()
+        try:
+            return sandbox.convert(source, max_pages)
+        finally:
+            self._idle.put(sandbox)
+
+    def warm_up(self):
+        """Start every sandbox and wait for all of them to load their converters"""
+        with self._warm_up_lock:
+            sandboxes = [self._idle.get() for _ in self.sandboxes]
+            try:
+                for sandbox in sandboxes:
+                    sandbox.start()
+                for sandbox in sandboxes:
+                    sandbox.warm_up()
+            finally:
+                for sandbox in sandboxes:
+                    self._idle.put(sandbox)
+
+    def close(self):
+        for sandbox in self.sandboxes:
+            sandbox.close()
@@ -0,0 +1,133 @@
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+
+COPY_CHUNK_SIZE = 64 * 1024
+
+
+class DocumentTooLarge(Exception):
+    """Raised when a document stream exceeds the allowed number of bytes"""
+
+
+class DocumentSource:
+    """A document to convert, held in memory or in a file on disk.
+
+    Small documents stay as bytes and are handed to docling as an in-memory
+    stream; larger ones are spilled to a uniquely named temporary file.
+    """
+
+    def __init__(self, name, data=None, path=None, owns_path=False, sha256=None):
+        self.name = name
+        self.data = data
+        self.path = path
+        # Temporary spill files are deleted by cleanup(); caller-provided paths are left alone
+        self.owns_path = owns_path
+        self._sha256 = sha256
+
+    @classmethod
+    def from_path(cls, path, name=None, owns_path=False):
+        return cls(name or os.path.basename(path), path=path, owns_path=owns_path)
+
+    @classmethod
+    def from_stream(cls, name, stream, spill_threshold, spill_dir=None, max_bytes=None):
+        """Read a binary stream, keeping it in memory up to spill_threshold bytes and spilling beyond.
+        
+        The SHA-256 is computed as the bytes stream in, so hashing costs no extra pass.
+        """
+        digest = hashlib.sha256()
+        buffer = io.BytesIO()
+        spill_file = None
+        size = 0
+        try:
+            while True:
+                chunk = stream.read(COPY_CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                digest.update(chunk)
+                if max_bytes is not None and size > max_bytes:
+                    raise DocumentTooLarge(f'{name} exceeds the {max_bytes} byte limit')
+
+                if spill_file is None and size > spill_threshold:
+                    spill_file = tempfile.NamedTemporaryFile(
+                        dir=spill_dir, prefix='upload-', suffix=os.path.splitext(name)[1], delete=False
+                    )
+                    spill_file.write(buffer.getvalue())
+                    buffer = None
+                if spill_file is not None:
+                    spill_file.write(chunk)
+                else:
+                    buffer.write(chunk)
+        except BaseException:
+            if spill_file is not None:
+                spill_file.close()
+                os.remove(spill_file.name)
+            raise
+
+        if spill_file is not None:
+            spill_file.close()
+            return cls(name, path=spill_file.name, owns_path=True, sha256=digest.hexdigest())
+        return cls(name, data=buffer.getvalue(), sha256=digest.hexdigest())
+
+    def sha256(self):
+        """SHA-256 hex digest of the document bytes, computed at most once"""
+        if self._sha256 is None:
+            digest = hashlib.sha256()
+            with self.open() as f:
+                for chunk in iter(lambda: f.read(COPY_CHUNK_SIZE), b''):
+                    digest.update(chunk)
+            self._sha256 = digest.hexdigest()
+        return self._sha256
+
+    @property
+    def size(self):
+        if self.data is not None:
+            return len(self.data)
+        return os.path.getsize(self.path)
+
+    def open(self):
+        """Open the document bytes for reading"""
+        if self.data is not None:
+            return io.BytesIO(self.data)
+        return open(self.path, 'rb')
+
+    def read_bytes(self):
+        if self.data is not None:
+            return self.data
+        with open(self.path, 'rb') as f:
+            return f.read()
+
+    def to_converter_input(self):
+        """Return what DocumentConverter.convert() accepts: an in-memory DocumentStream or a path"""
+        if self.data is not None:
+            from docling.datamodel.base_models import DocumentStream
+            return DocumentStream(name=self.name, stream=io.BytesIO(self.data))
+        return self.path
+
+    def save_to(self, path):
+        """Write the document to path and return a path-backed source that owns it"""
+        if self.data is not None:
+            with open(path, 'wb') as f:
+                f.write(self.data)
+        elif self.owns_path:
+            shutil.move(self.path, path)
+        else:
+            shutil.copyfile(self.path, path)
+        return DocumentSource(self.name, path=path, owns_path=True, sha256=self._sha256)
+
+    def cleanup(self):
+        """Delete the spill file, if this source owns one"""
+        if self.owns_path and self.path and os.path.exists(self.path):
+            try:
+                os.remove(self.path)
+            except OSError as e:
+                print(f"Failed to remove temporary file {self.path}: {e}")
+
+
+def as_document_source(source):
+    """Accept either a DocumentSource or a file path"""
+    if isinstance(source, DocumentSource):
+        return source
+    return DocumentSource.from_path(source)
@@ -0,0 +1,219 @@
+import threading
+import zipfile
+import xml.etree.ElementTree as ET
+from collections import OrderedDict
+
+from layout_index import build_line_layout
+
+ZIP_SIGNATURE = b'PK\x03\x04'
+
+W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+MC_FALLBACK = '{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback'
+
+# Word's font size when neither the styles nor the run set one: 20 half-points
+DEFAULT_HALF_POINTS = 20
+
+# Documents made from the same template share styles.xml, which can be far larger than the
+# text itself, so parsed styles are kept by the member's CRC and size
+STYLES_CACHE_ENTRIES = 32
+_styles_cache = OrderedDict()
+_styles_cache_lock = threading.Lock()
+
+
+class DocxReadError(Exception):
+    """Raised when a file can't be read as a Word document"""
+
+
+def is_docx(source):
+    """Check for the ZIP signature every DOCX starts with"""
+    with source.open() as f:
+        return f.read(len(ZIP_SIGNATURE)) == ZIP_SIGNATURE
+
+
+def _val(element, path):
+    """Return the w:val attribute of the child at path, or None"""
+    child = element.find(path) if element is not None else None
+    return child.get(f'{W}val') if child is not None else None
+
+
+def _half_points(value):
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+class DocxStyles:
+    """Font sizes from styles.xml, resolved through each style's basedOn chain"""
+
+    def __init__(self, default_size=DEFAULT_HALF_POINTS):
+        self.default_size = default_size
+        self.default_paragraph_style = None
+        self._sizes = {}
+        self._based_on = {}
+        self._resolved = {}
+
+    @classmethod
+    def parse(cls, stream):
+        styles = cls()
+        root = ET.parse(stream).getroot()
+        default_size = _half_points(_val(root, f'{W}docDefaults/{W}rPrDefault/{W}rPr/{W}sz'))
+        if default_size:
+            styles.default_size = default_size
+
+        for style in root.iter(f'{W}style'):
+            style_id = style.get(f'{W}styleId')
+            if not style_id:
+                continue
+            if style.get(f'{W}type') == 'paragraph' and style.get(f'{W}default') in ('1', 'true'):
+                styles.default_paragraph_style = style_id
+            styles._sizes[style_id] = _half_points(_val(style, f'{W}rPr/{W}sz'))
+            styles._based_on[style_id] = _val(style, f'{W}basedOn')
+        return styles
+
+    def size(self, style_id):
+        """Font size in half-points set by a style or the styles it is based on, or None"""
+        if style_id in self._resolved:
+            return self._resolved[style_id]
+
+        size = None
+        seen = set()
+        current = style_id
+        # Walk up the basedOn chain; the set guards against cycles in malformed files
+        while current and current not in seen:
+            seen.add(current)
+            size = self._sizes.get(current)
+            if size:
+                break
+            current = self._based_on.get(current)
+        self._resolved[style_id] = size
+        return size
+
+    def paragraph_size(self, style_id):
+        """Font size in half-points of runs in a paragraph of this style without their own size"""
+        return (self.size(style_id or self.default_paragraph_style)
+                or self.size(self.default_paragraph_style)
+                or self.default_size)
+
+
+def extract_docx_text(source):
+    """Read the text and run font sizes of a DOCX straight from its XML.
+
+    word/document.xml is streamed with iterparse, so memory use doesn't grow with the
+    document. Returns (text, LayoutIndex) with one element per paragraph line, carrying
+    the largest font size (in points) of the line's runs, resolved from direct
+    formatting, character and paragraph styles and the document defaults.
+    """
+    try:
+        with source.open() as f, zipfile.ZipFile(f) as archive:
+            names = set(archive.namelist())
+            if 'word/document.xml' not in names:
+                raise DocxReadError('not a Word document (no word/document.xml)')
+
+            styles = _load_styles(archive) if 'word/styles.xml' in names else DocxStyles()
+
+            with archive.open('word/document.xml') as document_stream:
+                lines = _read_paragraph_lines(document_stream, styles)
+    except (zipfile.BadZipFile, ET.ParseError) as e:
+        raise DocxReadError(f'unreadable Word document: {e}')
+
+    return build_line_layout(lines)
+
+
+def _load_styles(archive):
+    """Parse word/styles.xml, reusing the result for identical styles parts"""
+    info = archive.getinfo('word/styles.xml')
+    key = (info.CRC, info.file_size)
+    with _styles_cache_lock:
+        styles = _styles_cache.get(key)
+        if styles is not None:
+            _styles_cache.move_to_end(key)
+            return styles
+
+    with archive.open(info) as styles_stream:
+        styles = DocxStyles.parse(styles_stream)
+
+    with _styles_cache_lock:
+        _styles_cache[key] = styles
+        while len(_styles_cache) > STYLES_CACHE_ENTRIES:
+            _styles_cache.popitem(last=False)
+    return styles
+
+
+def _read_paragraph_lines(stream, styles):
+    """Stream document.xml, returning (line text, font size in points) for every paragraph line"""
+    lines = []
+    # Paragraphs nest when a run holds a text box, so open paragraphs are kept on a stack
+    paragraphs = []
+    fallback_depth = 0
+
+    for event, element in ET.iterparse(stream, events=('start', 'end')):
+        tag = element.tag
+        if tag == MC_FALLBACK:
+            # Fallback content repeats the text of the preceding mc:Choice
+            fallback_depth += 1 if event == 'start' else -1
+            if event == 'end':
+                element.clear()
+            continue
+        if fallback_depth:
+            continue
+
+        if event == 'start':
+            if tag == f'{W}p':
+                paragraphs.append({'style': None, 'segments': []})
+            continue
+
+        if tag == f'{W}pPr' and paragraphs:
+            paragraphs[-1]['style'] = _val(element, f'{W}pStyle')
+        elif tag == f'{W}r' and paragraphs:
+            _read_run(element, paragraphs[-1], styles)
+            element.clear()
+        elif tag == f'{W}p' and paragraphs:
+            lines.extend(_paragraph_lines(paragraphs.pop()))
+            element.clear()
+
+    return lines
+
+
+def _read_run(run, paragraph, styles):
+    """Append a run's text to its paragraph, tagged with the run's font size"""
+    properties = run.find(f'{W}rPr')
+    if properties is not None and properties.find(f'{W}vanish') is not None:
+        # Hidden text
+        return
+
+    size = _half_points(_val(properties, f'{W}sz'))
+    if not size:
+        size = styles.size(_val(properties, f'{W}rStyle')) or styles.paragraph_size(paragraph['style'])
+
+    for child in run:
+        if child.tag == f'{W}t':
+            text = child.text or ''
+        elif child.tag in (f'{W}tab', f'{W}ptab'):
+            text = '\t'
+        elif child.tag in (f'{W}br', f'{W}cr'):
+            text = '\n'
+        elif child.tag == f'{W}noBreakHyphen':
+            text = '-'
+        else:
+            continue
+        paragraph['segments'].append((text, size / 2))
+
+
+def _paragraph_lines(paragraph):
+    """Split a paragraph's segments at line breaks into (line text, largest font size)"""
+    lines = []
+    chars = []
+    font_size = None
+    for text, size in paragraph['segments']:
+        parts = text.split('\n')
+        for index, part in enumerate(parts):
+            if index:
+                lines.append((''.join(chars), font_size))
+                chars = []
+                font_size = None
+            chars.append(part)
+            if part.strip() and (font_size is None or size > font_size):
+                font_size = size
+    lines.append((''.join(chars), font_size))
+    return lines
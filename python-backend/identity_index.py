@@ -0,0 +1,169 @@
+import os
+import re
+import sqlite3
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+from candidate_store import normalize_email
+from contact_scanner import digits_only, to_e164
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS identity_nodes (
+    candidate_id TEXT PRIMARY KEY,
+    parent TEXT NOT NULL,
+    person_id TEXT UNIQUE,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_identity_nodes_parent ON identity_nodes(parent);
+CREATE TABLE IF NOT EXISTS blocking_keys (
+    key TEXT PRIMARY KEY,
+    candidate_id TEXT NOT NULL
+);
+"""
+
+# Digits of the phone number kept in the name + phone blocking key
+PHONE_SUFFIX_DIGITS = 7
+
+NAME_WORD_PATTERN = re.compile(r'[^\W\d_]+')
+
+
+def blocking_keys(candidate, default_country_code=None):
+    """Keys under which records of the same person meet: email, E.164 phone, and name + phone suffix.
+
+    The name key catches the same number written with and without a country code; name
+    words are sorted so "Smith John" and "John Smith" agree.
+    """
+    keys = []
+    email = normalize_email(candidate.get('email'))
+    if email:
+        keys.append(f'email:{email}')
+
+    phone = candidate.get('contactNumber')
+    e164 = to_e164(phone, default_country_code)
+    if e164:
+        keys.append(f'phone:{e164}')
+
+    name_words = sorted(NAME_WORD_PATTERN.findall((candidate.get('fullName') or '').casefold()))
+    phone_digits = digits_only(phone or '')
+    if len(name_words) >= 2 and len(phone_digits) >= PHONE_SUFFIX_DIGITS:
+        keys.append(f"name_phone:{' '.join(name_words)}|{phone_digits[-PHONE_SUFFIX_DIGITS:]}")
+    return keys
+
+
+class IdentityIndex:
+    """Persistent union-find over candidate records, resolving them to people across batches.
+
+    Each blocking key remembers one record it was seen on, so a new record is resolved
+    with one primary-key lookup per key and a union with each cluster it meets. Every
+    record is issued a personId, and a cluster goes by its root's. When two clusters
+    merge, the older root survives, so a person keeps the personId issued first; the
+    personIds of absorbed records still resolve to the person. Paths are compressed on
+    every find.
+    """
+
+    def __init__(self, db_path, default_country_code=None):
+        self.db_path = db_path
+        self.default_country_code = default_country_code
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def resolve(self, candidates):
+        """Add candidate records to the index in one transaction.
+
+        Returns {candidate id: {'personId': ..., 'mergedWith': [other candidate ids]}},
+        listing every other record of the same person, earlier batches included.
+        Resolving a record again after a correction adds its new keys, but keys it no
+        longer has stay in the index and unions are never undone: corrections can merge
+        people, not split them.
+        """
+        with self._lock, self._connect() as conn:
+            for candidate in candidates:
+                candidate_id = candidate['id']
+                conn.execute(
+                    'INSERT OR IGNORE INTO identity_nodes (candidate_id, parent, person_id, created_at) '
+                    'VALUES (?, ?, ?, ?)',
+                    (candidate_id, candidate_id, str(uuid.uuid4()), datetime.now().isoformat())
+                )
+                for key in blocking_keys(candidate, self.default_country_code):
+                    row = conn.execute('SELECT candidate_id FROM blocking_keys WHERE key = ?', (key,)).fetchone()
+                    if row is None:
+                        conn.execute('INSERT INTO blocking_keys (key, candidate_id) VALUES (?, ?)', (key, candidate_id))
+                    else:
+                        self._union(conn, candidate_id, row[0])
+
+            resolved = {}
+            for candidate in candidates:
+                root = self._find(conn, candidate['id'])
+                members = self._members(conn, root)
+                resolved[candidate['id']] = {
+                    'personId': self._person_id(conn, root),
+                    'mergedWith': [member for member in members if member != candidate['id']]
+                }
+        return resolved
+
+    def person(self, person_id):
+        """Return {'personId': current personId, 'candidateIds': [...]} for any personId issued, or None"""
+        with self._lock, self._connect() as conn:
+            row = conn.execute('SELECT candidate_id FROM identity_nodes WHERE person_id = ?', (person_id,)).fetchone()
+            if row is None:
+                return None
+            root = self._find(conn, row[0])
+            return {'personId': self._person_id(conn, root), 'candidateIds': self._members(conn, root)}
+
+    def _find(self, conn, candidate_id):
+        path = []
+        current = candidate_id
+        while True:
+            parent = conn.execute('SELECT parent FROM identity_nodes WHERE candidate_id = ?', (current,)).fetchone()[0]
+            if parent == current:
+                break
+            path.append(current)
+            current = parent
+        # Point every node on the path straight at the root
+        if len(path) > 1:
+            conn.executemany('UPDATE identity_nodes SET parent = ? WHERE candidate_id = ?',
+                             [(current, node) for node in path[:-1]])
+        return current
+
+    def _union(self, conn, candidate_id, other_id):
+        roots = {self._find(conn, candidate_id), self._find(conn, other_id)}
+        if len(roots) == 1:
+            return
+        # The older cluster survives, keeping its personId
+        rows = conn.execute(
+            "SELECT candidate_id FROM identity_nodes WHERE candidate_id IN (?, ?) ORDER BY created_at, rowid",
+            tuple(roots)
+        ).fetchall()
+        survivor, absorbed = rows[0][0], rows[1][0]
+        conn.execute('UPDATE identity_nodes SET parent = ? WHERE candidate_id = ?', (survivor, absorbed))
+
+    def _members(self, conn, root):
+        """Every record in the cluster under root, oldest first"""
+        rows = conn.execute(
+            'WITH RECURSIVE cluster(candidate_id) AS ('
+            '  SELECT ? UNION SELECT n.candidate_id FROM identity_nodes n JOIN cluster c ON n.parent = c.candidate_id'
+            ') SELECT n.candidate_id FROM identity_nodes n JOIN cluster c ON n.candidate_id = c.candidate_id '
+            'ORDER BY n.created_at, n.rowid',
+            (root,)
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    @staticmethod
+    def _person_id(conn, root):
+        return conn.execute('SELECT person_id FROM identity_nodes WHERE candidate_id = ?', (root,)).fetchone()[0]
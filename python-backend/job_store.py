@@ -0,0 +1,163 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    total_uploaded INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS job_files (
+    job_id TEXT NOT NULL REFERENCES jobs(id),
+    seq INTEGER NOT NULL,
+    file_name TEXT NOT NULL,
+    path TEXT NOT NULL,
+    status TEXT NOT NULL,
+    result TEXT,
+    updated_at TEXT NOT NULL,
+    owner TEXT,
+    lease_until REAL,
+    PRIMARY KEY (job_id, seq)
+);
+CREATE INDEX IF NOT EXISTS idx_job_files_status ON job_files(status);
+"""
+
+# Columns added after the first release, created on databases that predate them
+ADDED_COLUMNS = (('owner', 'TEXT'), ('lease_until', 'REAL'))
+
+
+class JobStore:
+    """SQLite-backed state for batch parsing jobs, so queued work survives a restart.
+
+    A process claims a file before parsing it, taking a lease of lease_seconds. Claims
+    are single UPDATEs, so when several processes share the database (server workers,
+    or a restarted server finding work another process still runs) each file is
+    parsed by one of them; a file is taken over only once its lease has expired.
+    """
+
+    def __init__(self, db_path, lease_seconds=900):
+        self.db_path = db_path
+        self.lease_seconds = lease_seconds
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._owner = None
+        self._owner_pid = None
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(SCHEMA)
+            columns = {row['name'] for row in conn.execute('PRAGMA table_info(job_files)')}
+            for column, column_type in ADDED_COLUMNS:
+                if column not in columns:
+                    conn.execute(f'ALTER TABLE job_files ADD COLUMN {column} {column_type}')
+
+    @property
+    def owner(self):
+        """Identifies this process in claims; a forked worker gets its own"""
+        if self._owner_pid != os.getpid():
+            self._owner = f'{os.getpid()}-{uuid.uuid4().hex}'
+            self._owner_pid = os.getpid()
+        return self._owner
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def create_job(self, job_id, files, total_uploaded=None):
+        """Record a new job whose files (dicts with 'path' and 'name') are all queued"""
+        now = datetime.now().isoformat()
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                'INSERT INTO jobs (id, created_at, total_uploaded) VALUES (?, ?, ?)',
+                (job_id, now, total_uploaded if total_uploaded is not None else len(files))
+            )
+            conn.executemany(
+                'INSERT INTO job_files (job_id, seq, file_name, path, status, updated_at) VALUES (?, ?, ?, ?, ?, ?)',
+                [(job_id, seq, f['name'], f['path'], 'queued', now) for seq, f in enumerate(files)]
+            )
+
+    def claim(self, job_id, seq):
+        """Mark a file running under this process's lease; False if it is done or another lease holds it"""
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE job_files SET status = 'running', owner = ?, lease_until = ?, updated_at = ? "
+                "WHERE job_id = ? AND seq = ? AND (status = 'queued' OR "
+                "(status = 'running' AND (lease_until IS NULL OR lease_until < ?)))",
+                (self.owner, now + self.lease_seconds, datetime.now().isoformat(), job_id, seq, now)
+            )
+            return cursor.rowcount == 1
+
+    def mark_done(self, job_id, seq, result):
+        """Record a claimed file's result; ignored if its lease has passed to another process"""
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "UPDATE job_files SET status = 'done', result = ?, lease_until = NULL, updated_at = ? "
+                "WHERE job_id = ? AND seq = ? AND owner = ? AND status = 'running'",
+                (json.dumps(result), datetime.now().isoformat(), job_id, seq, self.owner)
+            )
+
+    def get_job(self, job_id):
+        """Return job metadata with queued/running/done counts, or None if unknown"""
+        with self._connect() as conn:
+            job = conn.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+            if job is None:
+                return None
+            counts = dict(conn.execute(
+                'SELECT status, COUNT(*) FROM job_files WHERE job_id = ? GROUP BY status', (job_id,)
+            ).fetchall())
+
+        queued = counts.get('queued', 0)
+        running = counts.get('running', 0)
+        done = counts.get('done', 0)
+        total = queued + running + done
+        if done == total:
+            status = 'done'
+        elif running or done:
+            status = 'running'
+        else:
+            status = 'queued'
+
+        return {
+            'jobId': job['id'],
+            'status': status,
+            'createdAt': job['created_at'],
+            'totalUploaded': job['total_uploaded'],
+            'totalFiles': total,
+            'queued': queued,
+            'running': running,
+            'done': done
+        }
+
+    def get_results(self, job_id):
+        """Return the candidate records of finished files in submission order"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT result FROM job_files WHERE job_id = ? AND status = 'done' ORDER BY seq", (job_id,)
+            ).fetchall()
+        return [json.loads(row['result']) for row in rows]
+
+    def claimable_files(self):
+        """Return the files waiting to be claimed: queued ones and running ones whose lease has expired"""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT f.job_id, f.seq, f.file_name, f.path FROM job_files f JOIN jobs j ON j.id = f.job_id "
+                "WHERE f.status = 'queued' OR (f.status = 'running' AND (f.lease_until IS NULL OR f.lease_until < ?)) "
+                "ORDER BY j.created_at, f.seq",
+                (time.time(),)
+            ).fetchall()
+        return [{'jobId': row['job_id'], 'seq': row['seq'], 'name': row['file_name'], 'path': row['path']}
+                for row in rows]
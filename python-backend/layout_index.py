@@ -0,0 +1,129 @@
+import re
+from array import array
+
+TOKEN_PATTERN = re.compile(r'\w+')
+
+# Lines at or before this number count as the 'early' part of a document
+EARLY_LINE_LIMIT = 10
+
+
+def tokenize(text):
+    """Lower-cased word tokens used as inverted index keys"""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class LayoutIndex:
+    """Compact table of document text elements with an inverted token index.
+
+    Elements are stored in parallel arrays (text, offset into the full text, line
+    number, font size) in document order. The token index maps each lower-cased word
+    to the elements containing it, so font size and line lookups for a name cost one
+    dictionary lookup per name token instead of a scan over every element.
+    """
+
+    def __init__(self):
+        self.texts = []
+        self.offsets = array('l')
+        self.line_numbers = array('l')
+        self.font_sizes = []
+        self._token_index = {}
+
+    def add(self, text, line_number, font_size=None, offset=-1):
+        """Append an element and index its tokens"""
+        element_id = len(self.texts)
+        self.texts.append(text)
+        self.offsets.append(offset)
+        self.line_numbers.append(line_number)
+        self.font_sizes.append(self._as_float(font_size))
+
+        for token in set(tokenize(text)):
+            self._token_index.setdefault(token, []).append(element_id)
+        return element_id
+
+    @staticmethod
+    def _as_float(font_size):
+        if font_size is None:
+            return None
+        try:
+            return float(font_size)
+        except (TypeError, ValueError):
+            return None
+
+    def __len__(self):
+        return len(self.texts)
+
+    def elements_for(self, name):
+        """Return the ids of elements containing any token of name, in document order"""
+        element_ids = set()
+        for token in tokenize(name):
+            element_ids.update(self._token_index.get(token, ()))
+        return sorted(element_ids)
+
+    def first_element(self, name):
+        """Return the id of the earliest element containing any token of name, or None"""
+        first = None
+        for token in tokenize(name):
+            postings = self._token_index.get(token)
+            # Postings are appended in document order, so the head is the earliest element
+            if postings and (first is None or postings[0] < first):
+                first = postings[0]
+        return first
+
+    def largest_font(self, name):
+        """Return (largest font size, line number of that element) for elements matching name"""
+        best_size = None
+        best_line = None
+        for element_id in self.elements_for(name):
+            font_size = self.font_sizes[element_id]
+            if font_size is not None and (best_size is None or font_size > best_size):
+                best_size = font_size
+                best_line = self.line_numbers[element_id]
+        return best_size, best_line
+
+    def element_info(self, element_id):
+        """Return the formatting dict of an element, as the old formatting map exposed it"""
+        line_number = self.line_numbers[element_id]
+        return {
+            'line_number': line_number,
+            'font_size': self.font_sizes[element_id],
+            'position': 'early' if line_number <= EARLY_LINE_LIMIT else 'later'
+        }
+
+    def items(self):
+        """Iterate (text, formatting dict) pairs in document order"""
+        for element_id, text in enumerate(self.texts):
+            yield text, self.element_info(element_id)
+
+    def to_dict(self):
+        """Serialize to JSON-compatible parallel lists"""
+        return {
+            'texts': self.texts,
+            'offsets': self.offsets.tolist(),
+            'lineNumbers': self.line_numbers.tolist(),
+            'fontSizes': self.font_sizes
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild an index (including the token index) from to_dict() output"""
+        index = cls()
+        if not data:
+            return index
+        for text, offset, line_number, font_size in zip(
+                data['texts'], data['offsets'], data['lineNumbers'], data['fontSizes']):
+            index.add(text, line_number, font_size, offset)
+        return index
+
+
+def build_line_layout(lines):
+    """Join (line text, font size) pairs into document text and a LayoutIndex of its non-blank lines"""
+    formatting = LayoutIndex()
+    offset = 0
+    line_number = 0
+    for line, font_size in lines:
+        stripped = line.strip()
+        if stripped:
+            line_number += 1
+            formatting.add(stripped, line_number, font_size, offset + line.index(stripped))
+        offset += len(line) + 1
+    return '\n'.join(line for line, _font_size in lines), formatting
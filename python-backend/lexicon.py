@@ -0,0 +1,109 @@
+import os
+import re
+from functools import lru_cache
+
+# Bundled word lists; LEXICON_DIR may point at a directory of additional lists with the same names
+DEFAULT_LEXICON_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'lexicons')
+
+# Word lists whose entries rule out a word as part of a person's name
+NAME_EXCLUSION_CATEGORIES = ('job_titles', 'tech_terms', 'locations', 'companies', 'section_headers')
+
+
+def load_terms(path):
+    """Read one lower-cased term per line, skipping blank lines and # comments"""
+    terms = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            term = line.strip().lower()
+            if term and not term.startswith('#'):
+                terms.append(term)
+    return terms
+
+
+class PhraseMatcher:
+    """Multi-pattern substring matcher compiled into a single trie-shaped regex.
+
+    Sharing prefixes keeps the regex small and lets the engine reject most
+    positions after one character, so lookup cost barely grows with the number
+    of phrases.
+    """
+
+    def __init__(self, phrases):
+        self.phrases = frozenset(p for p in phrases if p)
+        self._regex = re.compile(self._build_pattern(self.phrases)) if self.phrases else None
+
+    @staticmethod
+    def _build_pattern(phrases):
+        trie = {}
+        for phrase in phrases:
+            node = trie
+            for char in phrase:
+                node = node.setdefault(char, {})
+            node[''] = {}
+
+        # Iterative post-order walk so very long phrases can't hit the recursion limit
+        patterns = {}
+        stack = [(trie, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if not expanded:
+                stack.append((node, True))
+                # A phrase ending here already matches, so longer continuations can be dropped
+                if '' not in node:
+                    stack.extend((child, False) for child in node.values())
+                continue
+
+            if '' in node:
+                patterns[id(node)] = ''
+                continue
+            alternatives = [re.escape(char) + patterns[id(child)] for char, child in sorted(node.items())]
+            patterns[id(node)] = alternatives[0] if len(alternatives) == 1 else '(?:' + '|'.join(alternatives) + ')'
+
+        return patterns[id(trie)]
+
+    def search(self, text):
+        """Return the first phrase occurrence in text (lower-cased by the caller), or None"""
+        if self._regex is None:
+            return None
+        match = self._regex.search(text)
+        return match.group(0) if match else None
+
+    def __contains__(self, text):
+        return self.search(text) is not None
+
+    def __len__(self):
+        return len(self.phrases)
+
+
+class Lexicon:
+    """Frozen word sets and phrase matchers used by name and email filtering"""
+
+    def __init__(self, terms):
+        self.terms = {category: frozenset(values) for category, values in terms.items()}
+        self.name_exclusion_words = frozenset().union(
+            *(self.terms.get(category, ()) for category in NAME_EXCLUSION_CATEGORIES)
+        )
+        self.excluded_name_phrases = PhraseMatcher(self.terms.get('excluded_name_phrases', ()))
+        self.invalid_email_patterns = PhraseMatcher(self.terms.get('invalid_email_patterns', ()))
+
+    @classmethod
+    def load(cls, *directories):
+        """Build a lexicon from every <category>.txt file in the given directories, merging repeats"""
+        terms = {}
+        for directory in directories:
+            if not directory or not os.path.isdir(directory):
+                continue
+            for filename in sorted(os.listdir(directory)):
+                if filename.endswith('.txt'):
+                    category = filename[:-len('.txt')]
+                    terms.setdefault(category, []).extend(load_terms(os.path.join(directory, filename)))
+        return cls(terms)
+
+    def sizes(self):
+        return {category: len(values) for category, values in self.terms.items()}
+
+
+@lru_cache(maxsize=None)
+def get_lexicon():
+    """Return the process-wide lexicon, built once on first use"""
+    return Lexicon.load(DEFAULT_LEXICON_DIR, os.environ.get('LEXICON_DIR'))
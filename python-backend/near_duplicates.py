@@ -0,0 +1,211 @@
+import os
+import sqlite3
+import threading
+import zlib
+from contextlib import contextmanager
+from datetime import datetime
+
+import numpy as np
+
+from search_index import tokenize
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS signatures (
+    candidate_id TEXT PRIMARY KEY,
+    signature BLOB NOT NULL,
+    created_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS lsh_buckets (
+    band INTEGER NOT NULL,
+    bucket BLOB NOT NULL,
+    candidate_id TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_lsh_buckets ON lsh_buckets(band, bucket);
+CREATE INDEX IF NOT EXISTS idx_lsh_buckets_candidate ON lsh_buckets(candidate_id);
+"""
+
+# Largest prime below 2**32: hashes of 32-bit shingles stay below 2**64 and fit in uint32
+MERSENNE_PRIME = 4294967291
+# Fixed so signatures computed by different processes and restarts stay comparable
+PERMUTATION_SEED = 1
+LOOKUP_CHUNK_SIZE = 500
+
+
+class MinHasher:
+    """MinHash signatures of texts, over hashed shingles of shingle_size consecutive words"""
+
+    def __init__(self, num_perm=128, shingle_size=3):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        generator = np.random.RandomState(PERMUTATION_SEED)
+        self._a = generator.randint(1, MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+        self._b = generator.randint(0, MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+
+    def shingles(self, text):
+        """CRC32s of the text's word shingles; a text shorter than one shingle is a single shingle"""
+        words = tokenize(text or '')
+        if not words:
+            return []
+        size = min(self.shingle_size, len(words))
+        return list({zlib.crc32(' '.join(words[i:i + size]).encode('utf-8'))
+                     for i in range(len(words) - size + 1)})
+
+    def signature(self, text):
+        """Return the uint32 MinHash signature of a text, or None if it has no words"""
+        shingles = self.shingles(text)
+        if not shingles:
+            return None
+        values = np.array(shingles, dtype=np.uint64)
+        # One row per shingle, one column per permutation: (a * x + b) mod p
+        hashed = (np.outer(values, self._a) + self._b) % np.uint64(MERSENNE_PRIME)
+        return hashed.min(axis=0).astype(np.uint32)
+
+
+def similarity(signature, other):
+    """Estimated Jaccard similarity of the shingle sets behind two signatures"""
+    return float(np.count_nonzero(signature == other)) / len(signature)
+
+
+class NearDuplicateIndex:
+    """Persistent LSH index of MinHash signatures for finding near-duplicate resumes.
+
+    Signatures are split into bands of rows_per_band values; documents sharing any band
+    are compared, and pairs whose estimated similarity reaches threshold are reported.
+    With the default 32 bands of 4 rows, pairs at 0.7 similarity are found with
+    near certainty while unrelated resumes rarely share a band, so a batch is checked
+    against everything indexed before in roughly linear time.
+    """
+
+    def __init__(self, db_path, threshold=0.7, num_perm=128, rows_per_band=4, shingle_size=3):
+        self.db_path = db_path
+        self.threshold = threshold
+        self.minhasher = MinHasher(num_perm, shingle_size)
+        self.rows_per_band = rows_per_band
+        self.bands = num_perm // rows_per_band
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _buckets(self, signature):
+        rows = self.rows_per_band
+        return [(band, signature[band * rows:(band + 1) * rows].tobytes()) for band in range(self.bands)]
+
+    def add(self, documents):
+        """Index (candidate id, text) pairs and return their near duplicates.
+
+        Each document is compared with the others of the batch and with every document
+        indexed before. Returns (candidate id, other candidate id, similarity) for each
+        pair at or above the threshold, the batch document first.
+        """
+        signatures = {}
+        for candidate_id, text in documents:
+            signature = self.minhasher.signature(text)
+            if signature is not None:
+                signatures[candidate_id] = signature
+        if not signatures:
+            return []
+
+        buckets = [(candidate_id, band, bucket)
+                   for candidate_id, signature in signatures.items()
+                   for band, bucket in self._buckets(signature)]
+
+        with self._lock, self._connect() as conn:
+            # Re-indexed documents must not match their own previous version
+            self._delete(conn, list(signatures))
+
+            # Candidate pairs from earlier batches, found with one join on the band index
+            conn.execute('CREATE TEMP TABLE batch_buckets (candidate_id TEXT, band INTEGER, bucket BLOB)')
+            conn.executemany('INSERT INTO batch_buckets VALUES (?, ?, ?)', buckets)
+            earlier_pairs = conn.execute(
+                'SELECT DISTINCT t.candidate_id, b.candidate_id FROM batch_buckets t '
+                'JOIN lsh_buckets b ON b.band = t.band AND b.bucket = t.bucket'
+            ).fetchall()
+            conn.execute('DROP TABLE batch_buckets')
+            earlier = self._signatures(conn, {other for _candidate_id, other in earlier_pairs})
+
+            conn.executemany(
+                'INSERT INTO signatures (candidate_id, signature, created_at) VALUES (?, ?, ?)',
+                [(candidate_id, signature.tobytes(), datetime.now().isoformat())
+                 for candidate_id, signature in signatures.items()]
+            )
+            conn.executemany('INSERT INTO lsh_buckets (candidate_id, band, bucket) VALUES (?, ?, ?)', buckets)
+
+        # Candidate pairs within the batch share a bucket
+        batch_pairs = set()
+        members = {}
+        for candidate_id, band, bucket in buckets:
+            for other in members.setdefault((band, bucket), []):
+                batch_pairs.add((other, candidate_id))
+            members[band, bucket].append(candidate_id)
+
+        matches = []
+        for candidate_id, other in earlier_pairs:
+            score = similarity(signatures[candidate_id], earlier[other])
+            if score >= self.threshold:
+                matches.append((candidate_id, other, score))
+        for candidate_id, other in batch_pairs:
+            score = similarity(signatures[candidate_id], signatures[other])
+            if score >= self.threshold:
+                matches.append((candidate_id, other, score))
+        return matches
+
+    def _signatures(self, conn, candidate_ids):
+        candidate_ids = list(candidate_ids)
+        found = {}
+        for start in range(0, len(candidate_ids), LOOKUP_CHUNK_SIZE):
+            chunk = candidate_ids[start:start + LOOKUP_CHUNK_SIZE]
+            rows = conn.execute(
+                f"SELECT candidate_id, signature FROM signatures WHERE candidate_id IN ({', '.join('?' * len(chunk))})",
+                chunk
+            ).fetchall()
+            for candidate_id, signature in rows:
+                found[candidate_id] = np.frombuffer(signature, dtype=np.uint32)
+        return found
+
+    def _delete(self, conn, candidate_ids):
+        for start in range(0, len(candidate_ids), LOOKUP_CHUNK_SIZE):
+            chunk = candidate_ids[start:start + LOOKUP_CHUNK_SIZE]
+            placeholders = ', '.join('?' * len(chunk))
+            conn.execute(f'DELETE FROM signatures WHERE candidate_id IN ({placeholders})', chunk)
+            conn.execute(f'DELETE FROM lsh_buckets WHERE candidate_id IN ({placeholders})', chunk)
+
+
+def duplicate_clusters(pairs):
+    """Group (candidate id, other candidate id, similarity) pairs into connected clusters.
+
+    Returns [{'candidateIds': [...], 'pairs': [{'ids': [a, b], 'similarity': s}]}], the
+    largest cluster first.
+    """
+    parent = {}
+
+    def find(candidate_id):
+        parent.setdefault(candidate_id, candidate_id)
+        while parent[candidate_id] != candidate_id:
+            parent[candidate_id] = parent[parent[candidate_id]]
+            candidate_id = parent[candidate_id]
+        return candidate_id
+
+    for candidate_id, other, _score in pairs:
+        parent[find(candidate_id)] = find(other)
+
+    clusters = {}
+    for candidate_id, other, score in pairs:
+        cluster = clusters.setdefault(find(candidate_id), {'candidateIds': [], 'pairs': []})
+        cluster['pairs'].append({'ids': [candidate_id, other], 'similarity': round(score, 3)})
+        for member in (candidate_id, other):
+            if member not in cluster['candidateIds']:
+                cluster['candidateIds'].append(member)
+    return sorted(clusters.values(), key=lambda cluster: -len(cluster['candidateIds']))
@@ -0,0 +1,107 @@
+import threading
+
+# Same models nltk.pos_tag / nltk.ne_chunk use for English
+PUNKT_MODEL = 'tokenizers/punkt/english.pickle'
+NE_CHUNKER_MODEL = 'chunkers/maxent_ne_chunker/english_ace_multiclass.pickle'
+
+# NLTK data packages the engine needs, by their nltk.data lookup path
+NLTK_DATA_PACKAGES = {
+    'punkt': 'tokenizers/punkt',
+    'stopwords': 'corpora/stopwords',
+    'averaged_perceptron_tagger': 'taggers/averaged_perceptron_tagger',
+    'maxent_ne_chunker': 'chunkers/maxent_ne_chunker',
+    'words': 'corpora/words',
+}
+
+
+def ensure_nltk_data():
+    """Download any required NLTK data that isn't installed yet"""
+    import nltk
+
+    for package, path in NLTK_DATA_PACKAGES.items():
+        try:
+            nltk.data.find(path)
+        except LookupError:
+            nltk.download(package)
+
+
+class NlpEngine:
+    """NLTK tokenizer, tagger and named-entity chunker, loaded once per process.
+
+    nltk.pos_tag builds a new PerceptronTagger (reloading its pickle) on every call and
+    nltk.ne_chunk looks its model up on every call. The engine keeps the models and tags
+    and chunks every sentence of a batch of documents in one call each. Calls are
+    serialized, so one engine can be shared between threads.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._use_lock = threading.Lock()
+        self._loaded = False
+
+    @property
+    def loaded(self):
+        return self._loaded
+
+    def load(self):
+        """Load the models if this process hasn't yet"""
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            # NLTK itself is slow to import, so it's only imported when the models are needed
+            import nltk
+            from nltk.corpus import stopwords
+            from nltk.tag.perceptron import PerceptronTagger
+            from nltk.tokenize import NLTKWordTokenizer
+
+            ensure_nltk_data()
+            self.sentence_tokenizer = nltk.data.load(PUNKT_MODEL)
+            self.word_tokenizer = NLTKWordTokenizer()
+            self.tagger = PerceptronTagger()
+            self.chunker = nltk.data.load(NE_CHUNKER_MODEL)
+            self.stopwords = frozenset(stopwords.words('english'))
+            self._loaded = True
+
+    def tokenize(self, document):
+        """Drop stopwords and split a document into tokenized sentences"""
+        self.load()
+        document = ' '.join([word for word in document.split() if word.lower() not in self.stopwords])
+        return [self.word_tokenizer.tokenize(sentence) for sentence in self.sentence_tokenizer.tokenize(document)]
+
+    def tag_documents(self, documents):
+        """POS-tag every sentence of every document with one batched tagger call"""
+        self.load()
+        with self._use_lock:
+            sentences_per_document = [self.tokenize(document) for document in documents]
+            flat_sentences = [sentence for sentences in sentences_per_document for sentence in sentences]
+            flat_tagged = self.tagger.tag_sents(flat_sentences)
+        return self._regroup(flat_tagged, sentences_per_document)
+
+    def person_names(self, documents):
+        """Return the PERSON entities found in each document, in order of appearance"""
+        tagged_per_document = self.tag_documents(documents)
+        flat_tagged = [tagged for document in tagged_per_document for tagged in document]
+        with self._use_lock:
+            flat_trees = list(self.chunker.parse_sents(flat_tagged)) if flat_tagged else []
+
+        names = []
+        for trees in self._regroup(flat_trees, tagged_per_document):
+            document_names = []
+            for tree in trees:
+                for chunk in tree:
+                    if hasattr(chunk, 'label') and chunk.label() == 'PERSON':
+                        document_names.append(' '.join([c[0] for c in chunk]))
+            names.append(document_names)
+        return names
+
+    @staticmethod
+    def _regroup(flat, groups):
+        """Split a flat per-sentence list back into per-document lists"""
+        regrouped = []
+        offset = 0
+        for group in groups:
+            regrouped.append(flat[offset:offset + len(group)])
+            offset += len(group)
+        return regrouped
@@ -0,0 +1,126 @@
+import threading
+import unicodedata
+
+from layout_index import build_line_layout
+
+try:
+    # docling serializes its own pdfium calls on this lock, and pdfium is not thread-safe
+    from docling.utils.locks import pypdfium2_lock
+except ImportError:
+    pypdfium2_lock = threading.Lock()
+
+PDF_SIGNATURE = b'%PDF'
+
+
+class TextLayerRejected(Exception):
+    """Raised when a PDF's text layer is missing or fails the quality checks"""
+
+
+class TextLayerQuality:
+    """Thresholds deciding whether a PDF text layer is good enough to skip docling.
+
+    A text layer is rejected when it has fewer than min_chars_per_page visible
+    characters per page (scans, image-only pages), when more than max_bad_char_ratio
+    of its characters are replacement, private-use or control characters (fonts
+    without a usable Unicode map), when fewer than min_word_ratio of its tokens
+    contain a letter, or when tokens average more than max_avg_word_length
+    characters (words run together because spaces were lost).
+    """
+
+    def __init__(self, min_chars_per_page=100, max_bad_char_ratio=0.05, min_word_ratio=0.6,
+                 max_avg_word_length=20):
+        self.min_chars_per_page = min_chars_per_page
+        self.max_bad_char_ratio = max_bad_char_ratio
+        self.min_word_ratio = min_word_ratio
+        self.max_avg_word_length = max_avg_word_length
+
+    def problem(self, text, page_count):
+        """Return why text fails the checks, or None if it passes"""
+        visible = [char for char in text if not char.isspace()]
+        if not visible or len(visible) < self.min_chars_per_page * max(page_count, 1):
+            return f'text layer too sparse ({len(visible)} characters on {page_count} pages)'
+
+        bad_chars = sum(1 for char in visible if _is_bad_char(char))
+        if bad_chars / len(visible) > self.max_bad_char_ratio:
+            return f'text layer garbled ({bad_chars} of {len(visible)} characters unmapped)'
+
+        tokens = text.split()
+        words = sum(1 for token in tokens if any(char.isalpha() for char in token))
+        if words / len(tokens) < self.min_word_ratio:
+            return f'text layer garbled (only {words} of {len(tokens)} tokens are words)'
+
+        if len(visible) / len(tokens) > self.max_avg_word_length:
+            return 'text layer garbled (words run together)'
+        return None
+
+
+def _is_bad_char(char):
+    # U+FFFD, private use area glyphs and control characters come from fonts without a Unicode map
+    return char == '\ufffd' or unicodedata.category(char) in ('Co', 'Cc', 'Cs')
+
+
+def is_pdf(source):
+    """Check the document signature rather than trusting the file name"""
+    with source.open() as f:
+        return f.read(len(PDF_SIGNATURE)) == PDF_SIGNATURE
+
+
+def extract_pdf_text(source, quality=None, max_pages=None):
+    """Read the text layer of a PDF with pdfium, without layout models.
+
+    Returns (text, LayoutIndex, pages read, total pages). The index has one element per
+    text line, carrying the largest font size on the line, so font-priority name
+    selection works as it does with docling output. Only the first max_pages pages are
+    read when it is set. Raises TextLayerRejected when the text layer fails the quality
+    checks and the document should be converted by docling instead.
+    """
+    import pypdfium2 as pdfium
+    import pypdfium2.raw as pdfium_c
+
+    lines = []
+    with pypdfium2_lock:
+        pdf = pdfium.PdfDocument(source.data if source.data is not None else source.path)
+        try:
+            total_pages = len(pdf)
+            page_count = min(total_pages, max_pages) if max_pages else total_pages
+            for page_index in range(page_count):
+                page = pdf[page_index]
+                text_page = page.get_textpage()
+                try:
+                    if page_index:
+                        # A blank line between pages
+                        lines.append(('', None))
+                    lines.extend(_page_lines(pdfium_c, text_page))
+                finally:
+                    text_page.close()
+                    page.close()
+        finally:
+            pdf.close()
+
+    text, formatting = build_line_layout(lines)
+    problem = (quality or TextLayerQuality()).problem(text, page_count)
+    if problem:
+        raise TextLayerRejected(problem)
+    return text, formatting, page_count, total_pages
+
+
+def _page_lines(pdfium_c, text_page):
+    """Split a page's characters into (line text, largest font size on the line)"""
+    lines = []
+    chars = []
+    font_size = None
+    for index in range(text_page.count_chars()):
+        char = chr(pdfium_c.FPDFText_GetUnicode(text_page.raw, index))
+        if char == '\n':
+            lines.append((''.join(chars), font_size))
+            chars = []
+            font_size = None
+        elif char != '\r':
+            chars.append(char)
+            if not char.isspace() and not pdfium_c.FPDFText_IsGenerated(text_page.raw, index):
+                char_size = pdfium_c.FPDFText_GetFontSize(text_page.raw, index)
+                if font_size is None or char_size > font_size:
+                    font_size = round(char_size, 1)
+    if chars:
+        lines.append((''.join(chars), font_size))
+    return lines
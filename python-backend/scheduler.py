@@ -0,0 +1,80 @@
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, wait
+
+FAST_LANE = 'fast'
+HEAVY_LANE = 'heavy'
+
+# Rough relative conversion cost per page for each way a document can be converted
+PAGE_COSTS = {
+    'pdf_text': 0.01,
+    'ooxml': 0.01,
+    'docling': 1.0,
+    'ocr': 8.0
+}
+# Page count assumed when triage couldn't read one
+UNKNOWN_PAGE_COUNT = 2
+
+
+def estimate_cost(triage, pdf_engine='text', docx_engine='ooxml', max_pages=None):
+    """Classify a document by expected conversion cost from its triage findings.
+
+    Returns (lane, relative cost): text-layer PDFs and DOCX files read by the direct
+    engines go to the fast lane; scanned PDFs needing OCR and anything else docling
+    has to convert go to the heavy lane. max_pages caps the page count for PDFs
+    converted progressively.
+    """
+    if not triage:
+        return HEAVY_LANE, PAGE_COSTS['docling'] * UNKNOWN_PAGE_COUNT
+
+    document_format = triage.get('format')
+    pages = triage.get('pageCount') or UNKNOWN_PAGE_COUNT
+    if document_format == 'pdf':
+        if triage.get('hasTextLayer') is False:
+            method = 'ocr'
+        elif pdf_engine == 'text' and triage.get('hasTextLayer'):
+            method = 'pdf_text'
+        else:
+            method = 'docling'
+        if max_pages:
+            pages = min(pages, max_pages)
+    elif document_format == 'docx' and docx_engine == 'ooxml':
+        method = 'ooxml'
+    else:
+        method = 'docling'
+
+    lane = FAST_LANE if method in ('pdf_text', 'ooxml') else HEAVY_LANE
+    return lane, PAGE_COSTS[method] * pages
+
+
+def run_lanes(fast_tasks, heavy_tasks, submit, heavy_limit):
+    """Run tasks through submit(task) -> Future, yielding (task, future) as each finishes.
+
+    Both lanes share one executor. Heavy tasks are submitted first, but no more than
+    heavy_limit are queued or running at once, so they can never occupy every worker;
+    all fast tasks are submitted behind them and take the remaining workers in order.
+    A finished heavy task makes room for the next, which queues behind the fast work
+    still waiting. Unfinished tasks are cancelled if the caller stops early.
+    """
+    heavy_queue = deque(heavy_tasks)
+    futures = {}
+
+    def submit_heavy():
+        task = heavy_queue.popleft()
+        futures[submit(task)] = (task, HEAVY_LANE)
+
+    try:
+        while heavy_queue and len(futures) < max(heavy_limit, 1):
+            submit_heavy()
+        for task in fast_tasks:
+            futures[submit(task)] = (task, FAST_LANE)
+
+        while futures:
+            done, _pending = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                task, lane = futures.pop(future)
+                if lane == HEAVY_LANE and heavy_queue:
+                    submit_heavy()
+                yield task, future
+    finally:
+        for future in futures:
+            future.cancel()
@@ -0,0 +1,434 @@
+import copy
+import heapq
+import json
+import math
+import mmap
+import os
+import re
+import threading
+from array import array
+from contextlib import contextmanager
+from itertools import accumulate
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: no advisory file locks, so the index is safe to share between threads only
+    fcntl = None
+
+# Words, keeping dotted names and trailing +/# whole: "node.js", "c++", "c#"
+TOKEN_PATTERN = re.compile(r'[^\W_]+(?:\.[^\W_]+)*[+#]*')
+# A quoted phrase (the closing quote may be missing) or a bare word
+QUERY_PATTERN = re.compile(r'"([^"]*)"?|(\S+)')
+
+MANIFEST = 'manifest.json'
+# Held exclusively by a process changing the index, shared while loading it
+LOCK_FILE = 'index.lock'
+INDEX_FORMAT_VERSION = 1
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+
+def tokenize(text):
+    """Split text into lower-cased search terms"""
+    return TOKEN_PATTERN.findall(text.casefold())
+
+
+def parse_query(query):
+    """Parse a query into OR-ed clauses, each a list of AND-ed phrases (tuples of terms).
+
+    Terms are AND-ed by default; AND and OR (upper case) are operators, and quoted text
+    is a phrase. A bare word the tokenizer splits, like "ci/cd", is matched as a phrase.
+    """
+    clauses = [[]]
+    for match in QUERY_PATTERN.finditer(query):
+        phrase, word = match.groups()
+        if word == 'AND':
+            continue
+        if word == 'OR':
+            clauses.append([])
+            continue
+        terms = tuple(tokenize(phrase if phrase is not None else word))
+        if terms:
+            clauses[-1].append(terms)
+    return [clause for clause in clauses if clause]
+
+
+class Segment:
+    """An immutable batch of indexed documents on disk.
+
+    name.post holds every term's postings as native uint32s: the term's document
+    numbers, then their term frequencies, then each document's token positions. It is
+    memory-mapped, so only the postings a query touches are paged in. name.terms maps
+    each term to [offset, document frequency] and name.docs lists the candidate id and
+    token count of each document number.
+    """
+
+    def __init__(self, directory, name, deleted=()):
+        self.name = name
+        path = os.path.join(directory, name)
+        with open(f'{path}.terms') as f:
+            self.terms = json.load(f)
+        with open(f'{path}.docs') as f:
+            docs = json.load(f)
+        self.doc_ids = docs['ids']
+        self.doc_lengths = docs['lengths']
+        self.total_length = sum(self.doc_lengths)
+
+        with open(f'{path}.post', 'rb') as f:
+            if os.fstat(f.fileno()).st_size:
+                self.postings = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)).cast('I')
+            else:
+                self.postings = memoryview(array('I'))
+        self.deleted = frozenset(deleted)
+
+    def with_deleted(self, docs):
+        """Return a copy with more documents deleted; segments are shared with running searches"""
+        segment = copy.copy(self)
+        segment.deleted = self.deleted | frozenset(docs)
+        return segment
+
+    @property
+    def live_count(self):
+        return len(self.doc_ids) - len(self.deleted)
+
+    def term_postings(self, term):
+        """Return (document numbers, term frequencies, offset of the positions) for a term, or None"""
+        entry = self.terms.get(term)
+        if entry is None:
+            return None
+        offset, df = entry
+        return self.postings[offset:offset + df], self.postings[offset + df:offset + 2 * df], offset + 2 * df
+
+    def phrase_frequencies(self, phrase):
+        """Map each live document number containing the phrase to how often it occurs"""
+        if len(phrase) == 1:
+            postings = self.term_postings(phrase[0])
+            if postings is None:
+                return {}
+            docs, tfs, _positions = postings
+            return {doc: tf for doc, tf in zip(docs, tfs) if doc not in self.deleted}
+
+        term_postings = []
+        for term in phrase:
+            postings = self.term_postings(term)
+            if postings is None:
+                return {}
+            term_postings.append(postings)
+
+        # Documents holding every term, found from the rarest term's postings
+        candidates = None
+        for docs, _tfs, _positions in sorted(term_postings, key=lambda postings: len(postings[0])):
+            candidates = set(docs) if candidates is None else candidates.intersection(docs)
+            if not candidates:
+                return {}
+        candidates -= self.deleted
+
+        # Where each candidate's positions start in every term's postings
+        starts = []
+        for docs, tfs, positions in term_postings:
+            offsets = accumulate(tfs, initial=positions)
+            starts.append({doc: (start, tf) for doc, tf, start in zip(docs, tfs, offsets) if doc in candidates})
+
+        frequencies = {}
+        for doc in candidates:
+            matches = None
+            for index, term_starts in enumerate(starts):
+                start, tf = term_starts[doc]
+                shifted = {position - index for position in self.postings[start:start + tf]}
+                matches = shifted if matches is None else matches & shifted
+                if not matches:
+                    break
+            if matches:
+                frequencies[doc] = len(matches)
+        return frequencies
+
+
+def write_segment(directory, name, doc_ids, doc_lengths, postings):
+    """Write a segment from (term, document numbers, frequencies, positions) in term order.
+
+    The three postings lists are uint32 arrays, positions concatenated in document order.
+    """
+    data = array('I')
+    terms = {}
+    for term, docs, tfs, positions in postings:
+        terms[term] = [len(data), len(docs)]
+        data.extend(docs)
+        data.extend(tfs)
+        data.extend(positions)
+
+    path = os.path.join(directory, name)
+    with open(f'{path}.post', 'wb') as f:
+        data.tofile(f)
+    # dumps() encodes in C; dump() writes piece by piece
+    with open(f'{path}.terms', 'w') as f:
+        f.write(json.dumps(terms, separators=(',', ':')))
+    with open(f'{path}.docs', 'w') as f:
+        f.write(json.dumps({'ids': doc_ids, 'lengths': doc_lengths}, separators=(',', ':')))
+
+
+class SearchIndex:
+    """Incremental BM25 inverted index over candidate texts, with positional postings.
+
+    Every add() writes its documents to a new segment, so indexing a batch costs about
+    as much as tokenizing it. Segments are merged in groups of merge_factor segments of
+    similar size, keeping their number logarithmic in the document count. Re-indexing a
+    candidate id marks its earlier document deleted; deleted documents are dropped when
+    their segment is merged. Searches read a snapshot of the segment list and don't
+    block indexing.
+
+    Several processes (parser or server workers) may share a directory: changes are
+    made under an exclusive lock on index.lock after reloading the manifest, and a
+    process picks up the others' changes when the manifest has been replaced since it
+    last read it.
+    """
+
+    def __init__(self, directory, merge_factor=10):
+        self.directory = directory
+        self.merge_factor = max(merge_factor, 2)
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._next_segment = 0
+        self._segments = ()
+        self._locations = {}
+        self._manifest_stamp = None
+        with self._lock, self._file_lock(shared=True):
+            self._load()
+
+    @contextmanager
+    def _file_lock(self, shared=False):
+        """Lock the index against other processes; callers hold _lock"""
+        if fcntl is None:
+            yield
+            return
+        with open(os.path.join(self.directory, LOCK_FILE), 'a') as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    def _stamp(self):
+        """Identifies the current manifest; it is replaced, never rewritten in place, on every commit"""
+        try:
+            stat = os.stat(os.path.join(self.directory, MANIFEST))
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def _load(self):
+        """Read the manifest if it changed since it was last read, reusing the segments already open"""
+        stamp = self._stamp()
+        if stamp is None or stamp == self._manifest_stamp:
+            return
+        with open(os.path.join(self.directory, MANIFEST)) as f:
+            manifest = json.load(f)
+        self._manifest_stamp = stamp
+        if manifest.get('version') != INDEX_FORMAT_VERSION:
+            print(f"Ignoring search index in {self.directory}: unsupported format version")
+            return
+
+        self._next_segment = manifest['nextSegment']
+        open_segments = {segment.name: segment for segment in self._segments}
+        segments = []
+        for entry in manifest['segments']:
+            segment = open_segments.get(entry['name'])
+            if segment is None:
+                segment = Segment(self.directory, entry['name'], entry['deleted'])
+            elif len(entry['deleted']) != len(segment.deleted):
+                segment = segment.with_deleted(entry['deleted'])
+            segments.append(segment)
+        self._segments = tuple(segments)
+        self._locations = {}
+        for segment in self._segments:
+            for doc, candidate_id in enumerate(segment.doc_ids):
+                if doc not in segment.deleted:
+                    self._locations[candidate_id] = (segment.name, doc)
+
+    def refresh(self):
+        """Pick up segments committed by other processes"""
+        if self._stamp() == self._manifest_stamp:
+            return
+        with self._lock, self._file_lock(shared=True):
+            self._load()
+
+    def __len__(self):
+        return sum(segment.live_count for segment in self._segments)
+
+    @property
+    def segment_count(self):
+        return len(self._segments)
+
+    def add(self, documents):
+        """Index (candidate id, text) pairs, replacing earlier versions of the same ids"""
+        latest = dict(documents)
+        if not latest:
+            return
+
+        doc_ids = []
+        doc_lengths = []
+        postings = {}
+        for doc, (candidate_id, text) in enumerate(latest.items()):
+            terms = tokenize(text or '')
+            doc_ids.append(candidate_id)
+            doc_lengths.append(len(terms))
+            positions = {}
+            for position, term in enumerate(terms):
+                positions.setdefault(term, []).append(position)
+            for term, term_positions in positions.items():
+                docs, tfs, all_positions = postings.setdefault(term, ([], [], []))
+                docs.append(doc)
+                tfs.append(len(term_positions))
+                all_positions.extend(term_positions)
+
+        with self._lock, self._file_lock():
+            # Another process may have committed since this one last read the manifest
+            self._load()
+            name = self._new_segment_name()
+            write_segment(self.directory, name, doc_ids, doc_lengths, (
+                (term, array('I', docs), array('I', tfs), array('I', positions))
+                for term, (docs, tfs, positions) in sorted(postings.items())
+            ))
+            replaced = [self._locations[candidate_id] for candidate_id in doc_ids if candidate_id in self._locations]
+            segments = self._with_deletions(self._segments, replaced) + [Segment(self.directory, name)]
+            for doc, candidate_id in enumerate(doc_ids):
+                self._locations[candidate_id] = (name, doc)
+            self._commit(segments)
+            self._merge_segments()
+
+    def search(self, query, offset=0, limit=20):
+        """Rank live documents matching a query with BM25.
+
+        Returns (total matches, [(candidate id, score)]) for the requested page, best
+        first. Within an OR-ed query a document scores the sum of the clauses it matches.
+        """
+        clauses = parse_query(query)
+        self.refresh()
+        segments = self._segments
+        live_count = sum(segment.live_count for segment in segments)
+        if not clauses or not live_count:
+            return 0, []
+        average_length = sum(segment.total_length for segment in segments) / sum(
+            len(segment.doc_ids) for segment in segments) or 1
+
+        phrases = {phrase for clause in clauses for phrase in clause}
+        frequencies = {phrase: [segment.phrase_frequencies(phrase) for segment in segments] for phrase in phrases}
+        idf = {}
+        for phrase, per_segment in frequencies.items():
+            df = sum(len(found) for found in per_segment)
+            idf[phrase] = math.log(1 + (live_count - df + 0.5) / (df + 0.5))
+
+        scores = {}
+        for index, segment in enumerate(segments):
+            for clause in clauses:
+                matched = None
+                for phrase in sorted(clause, key=lambda phrase: len(frequencies[phrase][index])):
+                    found = frequencies[phrase][index].keys()
+                    matched = set(found) if matched is None else matched.intersection(found)
+                    if not matched:
+                        break
+                for doc in matched or ():
+                    length_norm = K1 * (1 - B + B * segment.doc_lengths[doc] / average_length)
+                    score = 0.0
+                    for phrase in clause:
+                        tf = frequencies[phrase][index][doc]
+                        score += idf[phrase] * tf * (K1 + 1) / (tf + length_norm)
+                    scores[index, doc] = scores.get((index, doc), 0.0) + score
+
+        top = heapq.nlargest(offset + limit, scores.items(), key=lambda item: item[1])[offset:]
+        return len(scores), [(segments[index].doc_ids[doc], score) for (index, doc), score in top]
+
+    def _new_segment_name(self):
+        self._next_segment += 1
+        return f'seg-{self._next_segment:06d}'
+
+    @staticmethod
+    def _with_deletions(segments, locations):
+        """Copy the segment list, marking the documents at (segment name, number) deleted"""
+        deleted = {}
+        for name, doc in locations:
+            deleted.setdefault(name, set()).add(doc)
+        return [segment.with_deleted(deleted[segment.name]) if segment.name in deleted else segment
+                for segment in segments]
+
+    def _commit(self, segments):
+        """Swap in a new segment list and record it in the manifest"""
+        segments = tuple(segments)
+        manifest = {
+            'version': INDEX_FORMAT_VERSION,
+            'nextSegment': self._next_segment,
+            'segments': [{'name': segment.name, 'deleted': sorted(segment.deleted)} for segment in segments]
+        }
+        manifest_path = os.path.join(self.directory, MANIFEST)
+        with open(f'{manifest_path}.tmp', 'w') as f:
+            json.dump(manifest, f)
+        os.replace(f'{manifest_path}.tmp', manifest_path)
+        self._manifest_stamp = self._stamp()
+        self._segments = segments
+
+    def _merge_segments(self):
+        """Merge merge_factor segments at a time while any size tier holds that many"""
+        while True:
+            tiers = {}
+            for segment in self._segments:
+                tier = int(math.log(max(segment.live_count, 1), self.merge_factor))
+                tiers.setdefault(tier, []).append(segment)
+            group = next((segments for segments in tiers.values() if len(segments) >= self.merge_factor), None)
+            if group is None:
+                return
+            self._merge(group[:self.merge_factor])
+
+    def _merge(self, group):
+        """Replace a group of segments with one holding their live documents"""
+        doc_ids = []
+        doc_lengths = []
+        renumbered = []
+        for segment in group:
+            base = len(doc_ids)
+            mapping = {}
+            for doc, candidate_id in enumerate(segment.doc_ids):
+                if doc not in segment.deleted:
+                    mapping[doc] = len(doc_ids)
+                    doc_ids.append(candidate_id)
+                    doc_lengths.append(segment.doc_lengths[doc])
+            # Without deletions documents keep their order and shift by a constant
+            renumbered.append(base if not segment.deleted else mapping)
+
+        def merged_postings():
+            for term in sorted(set().union(*(segment.terms for segment in group))):
+                merged_docs, merged_tfs, merged_positions = array('I'), array('I'), array('I')
+                for segment, mapping in zip(group, renumbered):
+                    postings = segment.term_postings(term)
+                    if postings is None:
+                        continue
+                    docs, tfs, start = postings
+                    if isinstance(mapping, int):
+                        # Whole blocks are copied; only the document numbers change
+                        merged_docs.extend(array('I', [doc + mapping for doc in docs]))
+                        merged_tfs.frombytes(tfs.tobytes())
+                        merged_positions.frombytes(segment.postings[start:start + sum(tfs)].tobytes())
+                        continue
+                    for doc, tf, offset in zip(docs, tfs, accumulate(tfs, initial=start)):
+                        if doc in mapping:
+                            merged_docs.append(mapping[doc])
+                            merged_tfs.append(tf)
+                            merged_positions.frombytes(segment.postings[offset:offset + tf].tobytes())
+                if merged_docs:
+                    yield term, merged_docs, merged_tfs, merged_positions
+
+        name = self._new_segment_name()
+        write_segment(self.directory, name, doc_ids, doc_lengths, merged_postings())
+        merged = Segment(self.directory, name)
+        group_names = {segment.name for segment in group}
+        segments = [segment for segment in self._segments if segment.name not in group_names] + [merged]
+        for doc, candidate_id in enumerate(doc_ids):
+            self._locations[candidate_id] = (name, doc)
+        self._commit(segments)
+
+        # Running searches may still read the old segments; their mappings close once released
+        for segment in group:
+            for extension in ('post', 'terms', 'docs'):
+                os.remove(os.path.join(self.directory, f'{segment.name}.{extension}'))
+
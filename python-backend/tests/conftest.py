@@ -0,0 +1,10 @@
+import os
+import sys
+import tempfile
+
+# app.py reads its configuration at import: keep its data out of the working tree and convert in-process
+os.environ.setdefault('DATA_FOLDER', tempfile.mkdtemp(prefix='resume-parser-tests-'))
+os.environ.setdefault('CONVERSION_SANDBOX', 'false')
+os.environ.setdefault('WARM_UP_ON_START', 'false')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,31 @@
+from app import ResumeParser
+from conversion_sandbox import ConversionTimeout
+from document_source import DocumentSource
+from layout_index import LayoutIndex
+
+FIRST_PAGE = 'John Smith\nSenior Software Engineer\nEmail: john.smith@gmail.com\n'
+
+
+class EscalationFailsParser(ResumeParser):
+    """Converts the first page fine, but the whole document times out"""
+
+    def __init__(self):
+        super().__init__(progressive_pages=1)
+
+    def _convert_text_with_formatting(self, source, max_pages=None):
+        if max_pages is None:
+            raise ConversionTimeout('conversion took longer than 120 seconds and was cancelled')
+        return FIRST_PAGE, LayoutIndex(), True, {'conversionEngine': 'pdf_text', 'pagesConverted': 1, 'totalPages': 3}
+
+
+def test_failed_escalation_keeps_first_pass_record():
+    source = DocumentSource('resume.pdf', data=b'%PDF-1.4 test')
+    [result] = EscalationFailsParser().extract_candidates_info([(source, 'resume.pdf')])
+
+    # Still missing the phone the escalation was after, but not replaced by a bare parse error
+    assert result['fullName'] == 'John Smith'
+    assert result['email'] == 'john.smith@gmail.com'
+    assert not result['failureReason'].startswith('Parse error')
+    assert result['pagesConverted'] == 1
+    assert 'conversionEscalated' not in result
+    assert 'Timeout' in result['escalationError']
@@ -0,0 +1,40 @@
+import io
+import zipfile
+
+import triage
+from document_source import DocumentSource
+
+
+class OctetStreamMagic:
+    """libmagic as it often answers for DOCX heads"""
+
+    @staticmethod
+    def from_buffer(head, mime=False):
+        return 'application/octet-stream'
+
+
+def make_docx():
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        archive.writestr('[Content_Types].xml', '<Types/>')
+        archive.writestr('word/document.xml', '<w:document><w:body><w:p/></w:body></w:document>')
+        archive.writestr('docProps/app.xml', '<Properties><Pages>2</Pages></Properties>')
+    return buffer.getvalue()
+
+
+def test_docx_misidentified_by_libmagic_falls_back_to_signature(monkeypatch):
+    monkeypatch.setattr(triage, 'magic', OctetStreamMagic)
+    result = triage.triage_document(DocumentSource('resume.docx', data=make_docx()), 30, 6)
+
+    assert result['format'] == 'docx'
+    assert result['pageCount'] == 2
+    assert result['verdict'] == triage.DEPRIORITIZE
+    assert any('application/octet-stream' in reason for reason in result['reasons'])
+
+
+def test_content_no_check_recognizes_is_rejected(monkeypatch):
+    monkeypatch.setattr(triage, 'magic', OctetStreamMagic)
+    result = triage.triage_document(DocumentSource('resume.pdf', data=b'\x00\x01 not a document'), 30, 6)
+
+    assert result['format'] is None
+    assert result['verdict'] == triage.REJECT
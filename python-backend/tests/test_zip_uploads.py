@@ -0,0 +1,22 @@
+import io
+import zipfile
+
+from werkzeug.datastructures import FileStorage
+
+import app
+
+
+def test_archive_over_member_limit_gets_failed_record(monkeypatch, tmp_path):
+    monkeypatch.setitem(app.app.config, 'ZIP_MAX_MEMBERS', 2)
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, 'w') as z:
+        for i in range(3):
+            z.writestr(f'resume{i}.pdf', b'%PDF-1.4')
+    archive.seek(0)
+
+    files = app.collect_upload_files([FileStorage(archive, filename='resumes.zip')], str(tmp_path))
+    [candidate] = [record for _index, record in app.iter_parsed_files(files)]
+
+    assert candidate['fileName'] == 'resumes.zip'
+    assert candidate['parseStatus'] == 'failed'
+    assert 'the limit is 2' in candidate['failureReason']
@@ -0,0 +1,211 @@
+import re
+import zipfile
+
+try:
+    import magic
+except ImportError:
+    # python-magic needs the libmagic system library; fall back to signature checks without it
+    magic = None
+
+from pdf_text import pypdfium2_lock
+
+SNIFF_BYTES = 2048
+
+PDF_MIME_TYPE = 'application/pdf'
+DOCX_MIME_TYPE = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+DOC_MIME_TYPE = 'application/msword'
+ZIP_MIME_TYPES = {'application/zip', 'application/x-zip-compressed', DOCX_MIME_TYPE}
+OLE_MIME_TYPES = {'application/x-ole-storage', 'application/CDFV2', 'application/vnd.ms-office', DOC_MIME_TYPE}
+
+OLE_SIGNATURE = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'
+
+# Pages sampled when checking a PDF for a text layer
+TEXT_LAYER_SAMPLE_PAGES = 3
+
+# A page tree node dictionary (no nested dictionaries) and the page count inside it
+PAGES_DICT_PATTERN = re.compile(rb'<<[^<>]*/Type\s*/Pages\b[^<>]*>>')
+PAGE_COUNT_PATTERN = re.compile(rb'/Count\s+(\d+)')
+DOCX_PAGES_PATTERN = re.compile(rb'<Pages>\s*(\d+)\s*</Pages>')
+
+ACCEPT = 'accept'
+DEPRIORITIZE = 'deprioritize'
+REJECT = 'reject'
+
+
+def sniff_mime_type(head):
+    """Return the MIME type of a document from its first bytes"""
+    return _sniff(head)[0]
+
+
+def _sniff(head):
+    """Return (MIME type, the unsupported type libmagic reported instead, or None).
+
+    libmagic's answer is used when it names a supported format. It often reports valid
+    DOCX heads or PDFs with leading junk as application/octet-stream or another ZIP
+    variant, so any other answer is checked against the file signatures, which win
+    when they recognize a document.
+    """
+    if magic is not None:
+        try:
+            mime_type = magic.from_buffer(head, mime=True)
+            if _document_format(mime_type, head) is not None:
+                return mime_type, None
+            signature_type = _signature_mime_type(head)
+            if _document_format(signature_type, head) is not None:
+                return signature_type, mime_type
+            return mime_type, None
+        except Exception as e:
+            print(f"libmagic could not identify document: {e}")
+    return _signature_mime_type(head), None
+
+
+def _signature_mime_type(head):
+    if head.startswith(b'%PDF') or b'%PDF-' in head[:1024]:
+        return PDF_MIME_TYPE
+    if head.startswith(b'PK\x03\x04'):
+        return 'application/zip'
+    if head.startswith(OLE_SIGNATURE):
+        return 'application/x-ole-storage'
+    return 'application/octet-stream'
+
+
+def _document_format(mime_type, head):
+    if mime_type == PDF_MIME_TYPE or head.startswith(b'%PDF'):
+        return 'pdf'
+    if mime_type in ZIP_MIME_TYPES:
+        return 'docx'
+    if mime_type in OLE_MIME_TYPES:
+        return 'doc'
+    return None
+
+
+def _inspect_pdf(source):
+    """Return (page count, has text layer) for a PDF, raising if pdfium can't open it"""
+    try:
+        import pypdfium2 as pdfium
+    except ImportError:
+        return _scan_pdf_structure(source.read_bytes())
+
+    with pypdfium2_lock:
+        pdf = pdfium.PdfDocument(source.data if source.data is not None else source.path)
+        try:
+            page_count = len(pdf)
+            has_text_layer = False
+            for page_index in range(min(page_count, TEXT_LAYER_SAMPLE_PAGES)):
+                page = pdf[page_index]
+                text_page = page.get_textpage()
+                try:
+                    if text_page.get_text_range().strip():
+                        has_text_layer = True
+                        break
+                finally:
+                    text_page.close()
+                    page.close()
+        finally:
+            pdf.close()
+    return page_count, has_text_layer
+
+
+def _scan_pdf_structure(data):
+    """Best-effort page count and text layer check from the raw PDF bytes.
+
+    Object streams can hide the page tree and fonts, so either value may be None.
+    """
+    counts = []
+    for pages_dict in PAGES_DICT_PATTERN.findall(data):
+        match = PAGE_COUNT_PATTERN.search(pages_dict)
+        if match:
+            counts.append(int(match.group(1)))
+    # The root of the page tree counts every page below it
+    page_count = max(counts) if counts else None
+
+    if b'/Font' in data:
+        has_text_layer = True
+    elif b'/Image' in data:
+        has_text_layer = False
+    else:
+        has_text_layer = None
+    return page_count, has_text_layer
+
+
+def _inspect_docx(source):
+    """Return (page count, has text layer) for a DOCX, or None if the archive isn't a Word document"""
+    with source.open() as f, zipfile.ZipFile(f) as archive:
+        names = set(archive.namelist())
+        if 'word/document.xml' not in names:
+            return None
+        page_count = None
+        # Word records the page count of its last layout in the extended properties
+        if 'docProps/app.xml' in names:
+            match = DOCX_PAGES_PATTERN.search(archive.read('docProps/app.xml'))
+            if match:
+                page_count = int(match.group(1))
+    return page_count, True
+
+
+def triage_document(source, max_pages, soft_max_pages):
+    """Decide, before conversion, whether a document is worth converting.
+
+    Sniffs the real content type and reads the page count and text layer presence
+    from the file structure. Returns a dict with the 'verdict' (accept, deprioritize
+    or reject), the findings and the reasons behind the verdict.
+    """
+    with source.open() as f:
+        head = f.read(SNIFF_BYTES)
+
+    mime_type, magic_type = _sniff(head) if head else (None, None)
+    result = {
+        'verdict': ACCEPT,
+        'mimeType': mime_type,
+        'format': _document_format(mime_type, head) if head else None,
+        'pageCount': None,
+        'hasTextLayer': None,
+        'reasons': []
+    }
+
+    def verdict(value, reason):
+        result['reasons'].append(reason)
+        # A rejection can't be downgraded to a lower-priority verdict
+        if result['verdict'] != REJECT:
+            result['verdict'] = value
+        return result
+
+    if not head:
+        return verdict(REJECT, 'File is empty')
+
+    document_format = result['format']
+    if document_format is None:
+        # Neither libmagic nor the file signatures recognize a document
+        return verdict(REJECT, f'File content is {mime_type}, not a PDF or Word document')
+
+    try:
+        if document_format == 'pdf':
+            result['pageCount'], result['hasTextLayer'] = _inspect_pdf(source)
+        elif document_format == 'docx':
+            inspected = _inspect_docx(source)
+            if inspected is None:
+                return verdict(REJECT, 'ZIP archive is not a Word document')
+            result['pageCount'], result['hasTextLayer'] = inspected
+    except Exception as e:
+        message = str(e)
+        if 'password' in message.lower():
+            return verdict(REJECT, 'Document is password-protected')
+        return verdict(REJECT, f'Corrupt or unreadable {document_format.upper()}: {message}')
+
+    extension = source.name.rsplit('.', 1)[-1].lower() if '.' in source.name else ''
+    if extension != document_format:
+        result['reasons'].append(f'Content is {document_format.upper()} but the file is named .{extension}')
+
+    page_count = result['pageCount']
+    if page_count == 0:
+        return verdict(REJECT, 'Document has no pages')
+    if page_count is not None and page_count > max_pages:
+        return verdict(REJECT, f'{page_count} pages is too long for a resume (limit {max_pages})')
+    if page_count is not None and page_count > soft_max_pages:
+        verdict(DEPRIORITIZE, f'{page_count} pages is unusually long for a resume')
+    if result['hasTextLayer'] is False:
+        verdict(DEPRIORITIZE, 'No text layer; the document needs OCR')
+    if magic_type is not None:
+        verdict(DEPRIORITIZE, f'libmagic reports {magic_type}, but the file signature is {document_format.upper()}')
+
+    return result
@@ -0,0 +1,47 @@
+import os
+import zipfile
+
+from document_source import DocumentSource, DocumentTooLarge
+
+
+class ZipLimitExceeded(Exception):
+    """Raised when an archive has too many members or decompresses to too many bytes"""
+
+
+def iter_zip_documents(zip_stream, is_supported, max_members, max_total_bytes,
+                       spill_threshold, spill_dir=None):
+    """Yield a DocumentSource for each supported member of a ZIP archive.
+
+    Members are decompressed one at a time straight from the archive stream; nothing
+    is extracted to disk unless a member is larger than spill_threshold. Sizes declared
+    in the archive can't be trusted, so the decompressed byte count is enforced while
+    reading. Raises ZipLimitExceeded when the archive breaks a limit.
+    """
+    try:
+        with zipfile.ZipFile(zip_stream, 'r') as zip_file:
+            members = []
+            for info in zip_file.infolist():
+                name = os.path.basename(info.filename)
+                # Skip directories, hidden files and macOS resource forks
+                if info.is_dir() or not name or name.startswith('.') or info.filename.startswith('__MACOSX/'):
+                    continue
+                if is_supported(name):
+                    members.append((info, name))
+
+            if len(members) > max_members:
+                raise ZipLimitExceeded(f'Archive has {len(members)} resumes; the limit is {max_members}')
+
+            total_bytes = 0
+            for info, name in members:
+                try:
+                    with zip_file.open(info) as member:
+                        source = DocumentSource.from_stream(
+                            name, member, spill_threshold, spill_dir, max_bytes=max_total_bytes - total_bytes
+                        )
+                except DocumentTooLarge:
+                    raise ZipLimitExceeded(f'Archive decompresses to more than {max_total_bytes} bytes')
+                total_bytes += source.size
+                yield source
+
+    except zipfile.BadZipFile:
+        raise Exception("Invalid ZIP file format")